@@ -3,9 +3,21 @@
 from __future__ import annotations
 
 import argparse
-from datetime import datetime
+import os
 import re
+import string
+import time
 from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+
+_DEFAULT_DATA_DIR = str(Path(__file__).resolve().parent / "data")
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+# Lowercases ASCII letters; every other non-alphanumeric character is
+# left for _SLUG_RE to collapse into a single dash.  Only valid for
+# ASCII text, since some other letters (e.g. the Kelvin sign) lower to
+# ASCII ones.
+_SLUG_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -14,14 +26,18 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("answer", help="The answer associated with the question.")
     parser.add_argument(
         "--data-dir",
-        default=str(Path(__file__).resolve().parent / "data"),
+        default=_DEFAULT_DATA_DIR,
         help="Destination directory for generated documents (default: %(default)s).",
     )
     return parser
 
 
+_PARSER = _build_parser()
+
+
 def _slugify(text: str, *, max_length: int = 48) -> str:
-    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    lowered = text.translate(_SLUG_TABLE) if text.isascii() else text.lower()
+    slug = _SLUG_RE.sub("-", lowered).strip("-")
     if not slug:
         slug = "entry"
     if len(slug) > max_length:
@@ -29,19 +45,51 @@ def _slugify(text: str, *, max_length: int = 48) -> str:
     return slug
 
 
+def _timestamp() -> str:
+    return time.strftime("%Y%m%d%H%M%S", time.localtime())
+
+
+def _write_record(path: Path, question: str, answer: str) -> None:
+    # Encode once and write through a raw descriptor, skipping the
+    # buffered text I/O stack that a file object would add per record.
+    payload = f"Question: {question}\nAnswer: {answer}\n".encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def add_many(pairs: Iterable[Tuple[str, str]], data_dir: Union[str, Path]) -> List[Path]:
+    """Store several question-answer pairs and return the created paths.
+
+    The directory is created once and every file shares one timestamp;
+    a running counter keeps the names unique within the batch.
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = _timestamp()
+    paths: List[Path] = []
+    for index, (question, answer) in enumerate(pairs):
+        file_path = data_dir / f"{timestamp}_{index:04d}_{_slugify(question)}.txt"
+        _write_record(file_path, question, answer)
+        paths.append(file_path)
+    return paths
+
+
 def main() -> None:
-    parser = _build_parser()
-    args = parser.parse_args()
+    args = _PARSER.parse_args()
 
     data_dir = Path(args.data_dir)
     data_dir.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"{timestamp}_{_slugify(args.question)}.txt"
+    filename = f"{_timestamp()}_{_slugify(args.question)}.txt"
     file_path = data_dir / filename
 
-    content = f"Question: {args.question}\nAnswer: {args.answer}\n"
-    file_path.write_text(content, encoding="utf-8")
+    _write_record(file_path, args.question, args.answer)
     print(str(file_path))
 
 
@@ -7,13 +7,15 @@ from pathlib import Path
 
 from rag_system.main import answer_question, initialise_rag
 
+_DEFAULT_DATA_DIR = str(Path(__file__).resolve().parent / "data")
+
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Answer a question using the local RAG index.")
     parser.add_argument("question", help="Question to ask the RAG system.")
     parser.add_argument(
         "--data-dir",
-        default=str(Path(__file__).resolve().parent / "data"),
+        default=_DEFAULT_DATA_DIR,
         help="Directory containing source documents (default: %(default)s).",
     )
     parser.add_argument(
@@ -31,9 +33,11 @@ def _build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+_PARSER = _build_parser()
+
+
 def main() -> None:
-    parser = _build_parser()
-    args = parser.parse_args()
+    args = _PARSER.parse_args()
 
     client = initialise_rag(args.data_dir)
     answer = answer_question(
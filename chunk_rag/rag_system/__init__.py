@@ -21,6 +21,8 @@ Modules
   separate retrievers for lexical (BM25 or TF‑IDF) and vector
   similarity and fuses their results.
 - :mod:`utils`: Helper routines for loading and splitting documents.
+- :mod:`cache`: Persistent caches of generated answers and embeddings.
+- :mod:`throttle`: Rate limiting and retries for concurrent OpenAI calls.
 - :mod:`main`: A high level interface exposing simple functions to
   initialise the index, add new documents and perform queries.
 
@@ -47,4 +49,4 @@ See the docstrings in individual modules for more details.
 from .embedding import EmbeddingModel
 from .rrf import reciprocal_rank_fusion
 from .hybrid_retrieval import HybridRetriever, Document
-from .utils import load_documents_from_dir, split_text
\ No newline at end of file
+from .utils import load_documents_from_dir, load_single_document, split_text
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+_arrays.py
+----------
+
+Array helpers shared by :mod:`hybrid_retrieval` and :mod:`cache`.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np  # type: ignore
+
+
+def _int8_codes(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantise rows to int8 with a symmetric per-row scale.
+
+    Returns the codes and the per-row factor that maps an integer dot
+    product with the codes back to the float scale.
+    """
+    peak = np.abs(vectors).max(axis=1) if vectors.size else np.zeros(len(vectors), np.float32)
+    peak[peak == 0] = 1
+    codes = np.rint(vectors * (127 / peak)[:, None]).astype(np.int8)
+    return codes, (peak / 127).astype(np.float32)
+
+
+def _append_rows(buffer: np.ndarray, size: int, rows: np.ndarray) -> np.ndarray:
+    """Write ``rows`` after the first ``size`` rows of ``buffer``.
+
+    ``buffer`` is used as a growable array whose capacity is its length.
+    When the rows do not fit, a new buffer with at least double the
+    capacity is allocated, so appending N rows one batch at a time
+    copies O(N) rows in total rather than O(N²).  The buffer holding
+    the rows is returned; callers must keep it in place of the old one.
+    """
+    if size == 0 and buffer.shape[1:] != rows.shape[1:]:
+        # the first rows fix the width of a previously empty buffer
+        buffer = np.empty((0,) + rows.shape[1:], dtype=buffer.dtype)
+    end = size + len(rows)
+    if end > len(buffer):
+        grown = np.empty((max(len(buffer) * 2, end),) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:size] = buffer[:size]
+        buffer = grown
+    buffer[size:end] = rows
+    return buffer
@@ -0,0 +1,43 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -ffast-math
+"""
+_bm25.pyx
+---------
+
+Cython kernel for the fallback BM25 scorer in :mod:`hybrid_retrieval`,
+used when numba is not installed.  ``setup.py`` compiles it when the
+package is built with Cython and a C compiler available; without it
+the numpy implementation is used instead.
+"""
+
+from libc.stdint cimport int32_t, int64_t
+
+
+def bm25_accumulate(
+    const int64_t[::1] qids,
+    const float[::1] idf,
+    const int64_t[::1] post_ptr,
+    const int32_t[::1] post_docs,
+    const int32_t[::1] post_freqs,
+    const float[::1] k_base,
+    float k1,
+    float[::1] out,
+):
+    """Add the BM25 scores of the query term ids ``qids`` to ``out``.
+
+    Takes the same arguments as :func:`._bm25_numba.bm25_accumulate`:
+    one CSR postings segment built by
+    ``LexicalRetriever._build_bm25_stats`` and the score array shared
+    by all segments.
+    """
+    cdef Py_ssize_t i, j
+    cdef int64_t tid
+    cdef int32_t doc
+    cdef float weight, f
+    for i in range(qids.shape[0]):
+        tid = qids[i]
+        weight = idf[tid] * (k1 + 1)
+        for j in range(post_ptr[tid], post_ptr[tid + 1]):
+            doc = post_docs[j]
+            f = post_freqs[j]
+            out[doc] += weight * f / (f + k_base[doc])
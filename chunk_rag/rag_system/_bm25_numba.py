@@ -0,0 +1,33 @@
+"""
+_bm25_numba.py
+--------------
+
+Numba kernel for the fallback BM25 scorer in
+:mod:`hybrid_retrieval`.  Importing this module requires ``numba``;
+:class:`~hybrid_retrieval.LexicalRetriever` imports it lazily and keeps
+its numpy implementation when numba is not installed.
+"""
+
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+from numba import njit  # type: ignore
+
+
+@njit(cache=True, fastmath=True)
+def bm25_accumulate(qids, idf, post_ptr, post_docs, post_freqs, k_base, k1, out):
+    """Add the BM25 scores of the query term ids ``qids`` to ``out``.
+
+    The postings arrays are one CSR segment as built by
+    ``LexicalRetriever._build_bm25_stats``.  Only the postings of the
+    query terms are visited, and every segment adds into the same
+    ``out`` array, so the work is proportional to the postings rather
+    than to the number of documents.
+    """
+    for i in range(qids.shape[0]):
+        tid = qids[i]
+        weight = idf[tid] * (k1 + 1)
+        for j in range(post_ptr[tid], post_ptr[tid + 1]):
+            doc = post_docs[j]
+            f = np.float32(post_freqs[j])
+            out[doc] += weight * f / (f + k_base[doc])
@@ -0,0 +1,574 @@
+"""
+cache.py
+--------
+
+Persistent caches that let :class:`~rag_system.main.RAGClient` skip
+retrieval and the chat completion call for questions it has already
+answered.  :class:`AnswerCache` matches questions verbatim (after
+case and whitespace normalisation) and lives in a small SQLite
+database; :class:`SemanticCache` also catches paraphrases by comparing
+query embeddings through a random projection LSH index.
+:class:`EmbeddingStore` keeps chunk embeddings keyed by the hash of
+their text, so unchanged or duplicated chunks are never embedded twice.
+With ``datasketch`` installed it can also find stored chunks whose text
+is nearly identical to a new one, using MinHash signatures.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np  # type: ignore
+
+from ._arrays import _append_rows, _int8_codes
+
+try:
+    from datasketch import MinHash, MinHashLSH  # type: ignore
+    _DATASKETCH_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    MinHash = MinHashLSH = None  # type: ignore
+    _DATASKETCH_AVAILABLE = False
+
+# datasketch 2 hashes with one of several schemes and must be told which
+# one produced stored hash values; older releases have a single scheme,
+# which 2.x calls "legacy".  Signatures are only compared within one.
+_MINHASH_SCHEME = getattr(MinHash(num_perm=1), "scheme", None) if _DATASKETCH_AVAILABLE else None
+
+logger = logging.getLogger(__name__)
+
+# Answers older than this are ignored and eventually overwritten.
+_DEFAULT_TTL = 7 * 24 * 3600
+
+# Random projection LSH layout: each table hashes a query to one of
+# 2**_LSH_PLANES buckets, and a cached query becomes a candidate when it
+# shares a bucket in any of the _LSH_TABLES tables.
+_LSH_PLANES = 16
+_LSH_TABLES = 8
+_SEMANTIC_THRESHOLD = 0.95
+
+# SQLite caps the number of bound parameters per statement.
+_SQL_BATCH = 500
+_STORE_DTYPES = ("float32", "float16", "int8")
+
+# Near-duplicate detection: MinHash over character 5-shingles, and the
+# estimated Jaccard similarity above which two chunks count as the same.
+_MINHASH_PERMUTATIONS = 128
+_SHINGLE_SIZE = 5
+_NEAR_DUPLICATE_THRESHOLD = 0.9
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """Return the MinHash signature of ``text``'s 5-shingles.
+
+    Returns ``None`` when ``datasketch`` is not installed.
+    """
+    if not _DATASKETCH_AVAILABLE:
+        return None
+    shingles = {
+        text[start:start + _SHINGLE_SIZE]
+        for start in range(max(len(text) - _SHINGLE_SIZE + 1, 1))
+    }
+    minhash = MinHash(num_perm=_MINHASH_PERMUTATIONS)
+    minhash.update_batch([shingle.encode("utf-8") for shingle in shingles])
+    return minhash.hashvalues
+
+
+def _minhash_from_signature(signature: np.ndarray) -> "MinHash":
+    """Rebuild a MinHash from values returned by :func:`minhash_signature`."""
+    if _MINHASH_SCHEME is None:
+        return MinHash(num_perm=len(signature), hashvalues=signature)
+    return MinHash(num_perm=len(signature), hashvalues=signature, scheme=_MINHASH_SCHEME)
+
+
+class AnswerCache:
+    """Store generated answers keyed by question and generation settings.
+
+    Keys combine the normalised question, chat model, ``top_k``, tag
+    filter, temperature and ``max_tokens`` with the ``corpus``
+    fingerprint, so a corpus that changed never sees the answers of
+    the old one.  A running client that indexes more documents assigns
+    the new fingerprint to :attr:`corpus`.
+
+    Parameters
+    ----------
+    path : str
+        Location of the SQLite database.  Parent directories are
+        created as needed.
+    ttl : float, optional
+        Lifetime of an entry in seconds.  ``None`` keeps entries until
+        the database is deleted.
+    corpus : str, optional
+        Fingerprint of the indexed documents, e.g. from
+        :func:`~rag_system.embedding.corpus_fingerprint`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl: Optional[float] = _DEFAULT_TTL,
+        corpus: str = "",
+    ) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.corpus = corpus
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers "
+                "(key TEXT PRIMARY KEY, answer TEXT NOT NULL, expires REAL)"
+            )
+
+    def key(
+        self,
+        query: str,
+        *,
+        model: str,
+        top_k: int,
+        tags: Optional[Sequence[str]] = None,
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        """Return the cache key for a question and its generation settings."""
+        payload = json.dumps(
+            {
+                "c": self.corpus,
+                "q": " ".join(query.lower().split()),
+                "m": model,
+                "k": top_k,
+                "t": sorted(tags or []),
+                "temp": temperature,
+                "n": max_tokens,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached answer for ``key`` or ``None`` if absent or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, expires FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        answer, expires = row
+        if expires is not None and expires < time.time():
+            return None
+        return answer
+
+    def set(self, key: str, answer: str) -> None:
+        """Store ``answer`` under ``key``."""
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, expires) VALUES (?, ?, ?)",
+                (key, answer, expires),
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class SemanticCache:
+    """Serve cached answers for questions that mean the same thing.
+
+    Query embeddings are hashed with random hyperplanes into several
+    LSH tables.  A lookup gathers the cached queries that share a
+    bucket with the new one, computes their exact cosine similarity and
+    returns the best answer if it reaches ``threshold``.  Entries are
+    only compared within the same ``scope``, a string describing the
+    model and generation settings that produced the answer.
+
+    Parameters
+    ----------
+    path : str, optional
+        SQLite database used to persist the cache.  Each answer is
+        appended as one row.  Without a path the cache lives in memory
+        only.
+    signature : str
+        Identifies the embedding space, e.g.
+        :attr:`EmbeddingModel.signature`.
+    corpus : str
+        Fingerprint of the indexed documents.  Entries stored under a
+        different signature, corpus or LSH layout are discarded when
+        the cache is opened.
+    n_planes, n_tables : int
+        Hyperplanes per table and number of tables.
+    threshold : float
+        Minimum cosine similarity for a cached answer to be reused.
+    seed : int
+        Seed for the hyperplanes, so that a reloaded cache hashes
+        queries exactly as before.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        signature: str = "",
+        corpus: str = "",
+        n_planes: int = _LSH_PLANES,
+        n_tables: int = _LSH_TABLES,
+        threshold: float = _SEMANTIC_THRESHOLD,
+        seed: int = 0,
+    ) -> None:
+        self.path = path
+        self.signature = signature
+        self.corpus = corpus
+        self.n_planes = n_planes
+        self.n_tables = n_tables
+        self.threshold = threshold
+        self.seed = seed
+        self._planes: Optional[np.ndarray] = None
+        self._bit_weights = np.left_shift(1, np.arange(n_planes, dtype=np.int64))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._reset()
+        if path is not None:
+            self._open(path)
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._buf[:len(self._answers)]
+
+    def _reset(self) -> None:
+        # Vectors live in a buffer that grows geometrically, so adding N
+        # entries copies O(N) rows in total
+        self._buf = np.empty((0, 0), dtype=np.float32)
+        self._answers: List[str] = []
+        self._scopes: List[str] = []
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(self.n_tables)]
+
+    def clear(self) -> None:
+        """Drop every cached answer, in memory and on disk."""
+        with self._lock:
+            self._reset()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries")
+
+    def _bucket_ids(self, vector: np.ndarray) -> np.ndarray:
+        if self._planes is None or self._planes.shape[2] != vector.shape[0]:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal(
+                (self.n_tables, self.n_planes, vector.shape[0])
+            ).astype(np.float32)
+        bits = (self._planes @ vector) > 0
+        return bits.astype(np.int64) @ self._bit_weights
+
+    def _append(self, vector: np.ndarray, scope: str, answer: str) -> None:
+        position = len(self._answers)
+        self._buf = _append_rows(self._buf, position, vector[None, :])
+        self._answers.append(answer)
+        self._scopes.append(scope)
+        for table, bucket in zip(self._tables, self._bucket_ids(vector).tolist()):
+            table.setdefault(bucket, []).append(position)
+
+    @staticmethod
+    def _normalise(embedding: np.ndarray) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def lookup(self, embedding: np.ndarray, scope: str) -> Optional[str]:
+        """Return the answer cached for the closest matching query, if any."""
+        vector = self._normalise(embedding)
+        with self._lock:
+            if vector is None or not self._answers or self._buf.shape[1] != vector.shape[0]:
+                return None
+            candidates = set()
+            for table, bucket in zip(self._tables, self._bucket_ids(vector).tolist()):
+                candidates.update(table.get(bucket, ()))
+            candidates = [i for i in candidates if self._scopes[i] == scope]
+            if not candidates:
+                return None
+            similarities = self._vectors[candidates] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._answers[candidates[best]]
+
+    def add(self, embedding: np.ndarray, scope: str, answer: str) -> None:
+        """Cache ``answer`` for the query ``embedding`` and persist it."""
+        vector = self._normalise(embedding)
+        if vector is None:
+            return
+        with self._lock:
+            if self._answers and self._buf.shape[1] != vector.shape[0]:
+                # The embedding space changed size; older entries cannot
+                # be compared with the new ones.
+                self._reset()
+                if self._conn is not None:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM entries")
+            self._append(vector, scope, answer)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO entries (scope, answer, vector) VALUES (?, ?, ?)",
+                        (scope, answer, vector.tobytes()),
+                    )
+
+    def set_corpus(self, corpus: str) -> None:
+        """Switch to a new corpus fingerprint, dropping every cached answer."""
+        with self._lock:
+            self.corpus = corpus
+            self._reset()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries")
+                    self._conn.execute("DELETE FROM meta")
+                    self._conn.executemany(
+                        "INSERT INTO meta (name, value) VALUES (?, ?)", self._settings().items()
+                    )
+
+    def _settings(self) -> Dict[str, str]:
+        return {
+            "signature": self.signature,
+            "corpus": self.corpus,
+            "seed": str(self.seed),
+            "n_planes": str(self.n_planes),
+        }
+
+    def _open(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(id INTEGER PRIMARY KEY, scope TEXT NOT NULL, answer TEXT NOT NULL, "
+                "vector BLOB NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            stored = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+            settings = self._settings()
+            if stored != settings:
+                # Answers from another embedding space, corpus or LSH
+                # layout must not be served
+                conn.execute("DELETE FROM entries")
+                conn.execute("DELETE FROM meta")
+                conn.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", settings.items())
+        self._conn = conn
+        rows = conn.execute("SELECT scope, answer, vector FROM entries ORDER BY id").fetchall()
+        for scope, answer, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if self._answers and len(vector) != self._buf.shape[1]:
+                continue
+            self._append(vector, scope, answer)
+
+    def close(self) -> None:
+        """Close the underlying database connection, if any."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EmbeddingStore:
+    """Content addressed store of chunk embeddings backed by SQLite.
+
+    Vectors are keyed by ``(model, content_hash)``, where ``model`` is
+    the embedder signature and ``content_hash`` comes from
+    :func:`~rag_system.utils.content_hash`.  Each row also records its dimension and
+    storage dtype so it is decoded correctly whatever the current
+    settings are.
+
+    Parameters
+    ----------
+    path : str
+        Location of the SQLite database.
+    dtype : str
+        Precision new vectors are stored at: ``"float32"``,
+        ``"float16"`` or ``"int8"`` (codes with one scale per vector).
+    """
+
+    def __init__(self, path: str, *, dtype: str = "float32") -> None:
+        if dtype not in _STORE_DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype: {dtype}")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        # Per model LSH index over the stored MinHash signatures, built
+        # from the database on first use and kept current by
+        # put_signatures
+        self._lsh: Dict[str, Tuple["MinHashLSH", Dict[str, "MinHash"]]] = {}
+        self._lsh_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "dtype TEXT NOT NULL, dim INTEGER NOT NULL, scale REAL, "
+                "vector BLOB NOT NULL, PRIMARY KEY (model, content_hash))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS minhashes ("
+                "model TEXT NOT NULL, content_hash TEXT NOT NULL, scheme TEXT NOT NULL, "
+                "signature BLOB NOT NULL, PRIMARY KEY (model, content_hash))"
+            )
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return the stored float32 vectors for ``hashes`` that are present."""
+        wanted = list(dict.fromkeys(hashes))
+        found: Dict[str, np.ndarray] = {}
+        for start in range(0, len(wanted), _SQL_BATCH):
+            batch = wanted[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT content_hash, dtype, dim, scale, vector FROM embeddings "
+                    f"WHERE model = ? AND content_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+            for key, dtype, dim, scale, blob in rows:
+                if dtype not in _STORE_DTYPES:
+                    continue
+                vector = np.frombuffer(blob, dtype=dtype)
+                if len(vector) != dim:
+                    continue
+                vector = vector.astype(np.float32)
+                if scale is not None:
+                    vector *= scale
+                found[key] = vector
+        return found
+
+    def put_many(self, model: str, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        """Store one row of ``vectors`` under each of ``hashes``."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales: List[Optional[float]] = [None] * len(vectors)
+        if self.dtype == "int8":
+            encoded, row_scales = _int8_codes(vectors)
+            scales = row_scales.tolist()
+        else:
+            encoded = vectors.astype(self.dtype)
+        dim = vectors.shape[1] if vectors.ndim == 2 else 0
+        rows = [
+            (model, key, self.dtype, dim, scale, row.tobytes())
+            for key, scale, row in zip(hashes, scales, encoded)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, content_hash, dtype, dim, scale, vector) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def put_signatures(self, model: str, signatures: Mapping[str, np.ndarray]) -> None:
+        """Record the MinHash signatures of stored chunks."""
+        scheme = _MINHASH_SCHEME or "legacy"
+        rows = [
+            (model, key, scheme, np.asarray(signature, dtype=np.uint64).tobytes())
+            for key, signature in signatures.items()
+        ]
+        with self._lsh_lock, self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO minhashes (model, content_hash, scheme, signature) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            if model in self._lsh:
+                lsh, stored = self._lsh[model]
+                for key, signature in signatures.items():
+                    if key not in stored:
+                        stored[key] = _minhash_from_signature(signature)
+                        lsh.insert(key, stored[key])
+
+    def _lsh_index(self, model: str) -> Tuple["MinHashLSH", Dict[str, "MinHash"]]:
+        """Return the LSH index of ``model``'s stored signatures."""
+        with self._lsh_lock:
+            return self._lsh.get(model) or self._build_lsh(model)
+
+    def _build_lsh(self, model: str) -> Tuple["MinHashLSH", Dict[str, "MinHash"]]:
+        lsh = MinHashLSH(threshold=_NEAR_DUPLICATE_THRESHOLD, num_perm=_MINHASH_PERMUTATIONS)
+        stored: Dict[str, MinHash] = {}
+        for key, signature in self._signatures(model):
+            stored[key] = _minhash_from_signature(signature)
+            lsh.insert(key, stored[key])
+        self._lsh[model] = (lsh, stored)
+        return lsh, stored
+
+    def _signatures(self, model: str) -> Iterator[Tuple[str, np.ndarray]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content_hash, signature FROM minhashes WHERE model = ? AND scheme = ?",
+                (model, _MINHASH_SCHEME or "legacy"),
+            ).fetchall()
+        for key, blob in rows:
+            signature = np.frombuffer(blob, dtype=np.uint64)
+            if len(signature) == _MINHASH_PERMUTATIONS:
+                yield key, signature
+
+    def near_duplicates(
+        self,
+        model: str,
+        signatures: Mapping[str, np.ndarray],
+        *,
+        threshold: float = _NEAR_DUPLICATE_THRESHOLD,
+    ) -> Dict[str, str]:
+        """Match new chunks to stored chunks with nearly the same text.
+
+        Parameters
+        ----------
+        model : str
+            Embedder signature the stored chunks must belong to.
+        signatures : mapping of str to numpy.ndarray
+            MinHash signatures of the new chunks, keyed by content hash.
+        threshold : float
+            Minimum estimated Jaccard similarity of the shingle sets.
+            Candidates come from an LSH index tuned for the default
+            threshold, which is built once per store and then updated
+            as signatures are added.
+
+        Returns
+        -------
+        dict
+            Maps content hashes from ``signatures`` to the content hash
+            of the most similar stored chunk; chunks without a match
+            are left out.
+        """
+        if not _DATASKETCH_AVAILABLE or not signatures:
+            return {}
+        lsh, stored = self._lsh_index(model)
+        if not stored:
+            return {}
+        matches: Dict[str, str] = {}
+        for key, signature in signatures.items():
+            minhash = _minhash_from_signature(signature)
+            best, best_similarity = None, threshold
+            for candidate in lsh.query(minhash):
+                similarity = minhash.jaccard(stored[candidate])
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+            if best is not None:
+                matches[key] = best
+        return matches
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
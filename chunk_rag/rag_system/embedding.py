@@ -8,6 +8,8 @@ language text into dense vector representations suitable for
 approximate nearest neighbour search.  If the OpenAI Python client
 library is not installed or an API key is not supplied, the class
 falls back to a simple TF‑IDF based embedding using scikit‑learn.
+Both libraries are imported on first use, so importing the package
+does not pay for whichever backend goes unused.
 
 By isolating the embedding logic in its own module, you can swap in
 other embedding models (e.g. Sentence‑Transformers) in the future
@@ -16,32 +18,92 @@ without touching the retrieval code.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import importlib.util
 import logging
 import os
-from typing import Iterable, List, Optional
-
-try:
-    from openai import OpenAI  # type: ignore
-    _OPENAI_AVAILABLE = True
-except ImportError:  # pragma: no cover
-    OpenAI = None  # type: ignore
-    _OPENAI_AVAILABLE = False
-
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.preprocessing import normalize
-    _SKLEARN_AVAILABLE = True
-except ImportError:  # pragma: no cover
-    TfidfVectorizer = None  # type: ignore
-    normalize = None  # type: ignore
-    _SKLEARN_AVAILABLE = False
-
-from .env import load_env
+import pickle
+import threading
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np  # type: ignore
+
+if TYPE_CHECKING:  # pragma: no cover
+    from openai import AsyncOpenAI, OpenAI
+    from scipy.sparse import csr_matrix
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+from .env import env_flag, load_env
+from .throttle import RateLimiter, call_with_retry, token_counter
 
 logger = logging.getLogger(__name__)
 
 load_env()
 
+# The embeddings endpoint rejects oversized requests, so inputs are sent
+# in sub-batches; a few of them are kept in flight at once to overlap
+# network latency without tripping rate limits.
+_EMBED_BATCH_SIZE = 256
+_MAX_CONCURRENT_REQUESTS = 8
+# A single request may carry at most 300k tokens; sub-batches are also
+# closed once they reach this budget so long chunks cannot push one
+# over the limit.
+_EMBED_BATCH_TOKENS = 250_000
+# Default rate limits of the embeddings endpoint; requests are throttled
+# to stay inside them rather than bouncing off HTTP 429s.
+_EMBED_REQUESTS_PER_MINUTE = 3_000
+_EMBED_TOKENS_PER_MINUTE = 1_000_000
+
+# Fitting a TF‑IDF vocabulary is the slowest step on large corpora, so
+# beyond this many documents (or when ``RAG_HASH_VEC`` is set) the
+# fallback uses a stateless HashingVectorizer instead.  Its width is
+# kept modest because the vector retriever densifies the rows.
+_HASHING_MIN_DOCS = 50_000
+_HASHING_FEATURES = 2 ** 16
+# Inputs at least this large are hashed in parallel chunks.
+_HASHING_PARALLEL_MIN_TEXTS = 20_000
+
+
+def _response_to_array(response: object) -> np.ndarray:
+    """Copy the vectors of an embeddings response into a float32 array."""
+    # The API returns a list of dicts with index and embedding; the
+    # indices are 0..N-1, so each vector goes straight to its row
+    data = response.data
+    out = np.empty((len(data), len(data[0].embedding)), dtype=np.float32)
+    for item in data:
+        out[item.index] = item.embedding
+    return out
+
+
+def _l2_normalise_rows(vectors: "csr_matrix") -> "csr_matrix":
+    """L2 normalise the rows of a CSR matrix in place and return it.
+
+    Row norms are computed straight from ``vectors.data`` and the data is
+    divided in place, so no second matrix is allocated.  Empty rows are
+    left as they are.
+    """
+    row_lengths = np.diff(vectors.indptr)
+    rows = np.repeat(np.arange(vectors.shape[0]), row_lengths)
+    norms = np.sqrt(np.bincount(rows, weights=vectors.data * vectors.data,
+                                minlength=vectors.shape[0]))
+    norms[norms == 0] = 1
+    vectors.data /= norms[rows].astype(vectors.data.dtype, copy=False)
+    return vectors
+
+
+def corpus_fingerprint(texts: Iterable[str]) -> str:
+    """Return a SHA‑256 fingerprint of an ordered collection of texts.
+
+    The fingerprint identifies the corpus a TF‑IDF vectoriser was fitted
+    on, so a saved fit can be reused only when the corpus is unchanged.
+    """
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
 
 class EmbeddingModel:
     """Compute embeddings for a collection of texts.
@@ -66,12 +128,30 @@ class EmbeddingModel:
                  openai_api_key: Optional[str] = None) -> None:
         self.model_name = model_name
         # Determine whether we can use OpenAI
-        self.use_openai = _OPENAI_AVAILABLE
+        try:
+            from openai import OpenAI  # type: ignore
+            self.use_openai = True
+        except ImportError:  # pragma: no cover
+            self.use_openai = False
         self._client: Optional[OpenAI] = None
+        self._api_key: Optional[str] = None
+        self._base_url: Optional[str] = None
+        # Corpus embedding sends many sub-batches concurrently through one
+        # long-lived AsyncOpenAI client and rate limiter.  Both belong to
+        # the event loop they were created on: the private loop that
+        # embed_batch runs them on, or the caller's loop for
+        # embed_batch_async.
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limiter: Optional[RateLimiter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
         if self.use_openai:
             api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
             if api_key:
                 base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1/")
+                self._api_key = api_key
+                self._base_url = base_url
                 try:
                     self._client = OpenAI(api_key=api_key, base_url=base_url)
                 except Exception as exc:  # pragma: no cover
@@ -86,8 +166,9 @@ class EmbeddingModel:
                     "OpenAI API key not found; falling back to TF‑IDF embeddings.")
                 self.use_openai = False
         # Prepare TF‑IDF vectoriser as fallback
-        self._tfidf_vectoriser: Optional[TfidfVectorizer] = None
-        if not self.use_openai and not _SKLEARN_AVAILABLE:
+        self._tfidf_vectoriser: Optional[Union[TfidfVectorizer, HashingVectorizer]] = None
+        self._tfidf_fingerprint: Optional[str] = None
+        if not self.use_openai and importlib.util.find_spec("sklearn") is None:
             raise RuntimeError(
                 "Neither OpenAI nor scikit‑learn is available. "
                 "Install one of them or supply an API key to use embeddings.")
@@ -100,68 +181,323 @@ class EmbeddingModel:
         fitted model.  Note that TF‑IDF performs best when fitted on
         the entire corpus; you should therefore pass in all documents
         when initialising the index.
+
+        Corpora of ``_HASHING_MIN_DOCS`` documents or more, or any corpus
+        when ``RAG_HASH_VEC`` is set, get a HashingVectorizer instead,
+        which needs no vocabulary and therefore no real fit.
         """
         if self._tfidf_vectoriser is None:
-            assert _SKLEARN_AVAILABLE  # sanity check
-            # Use simple whitespace tokenisation and keep case
+            from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+            # Use simple whitespace tokenisation and keep case.  A token
+            # pattern (rather than a Python tokenizer callback) keeps
+            # sklearn on its compiled regex path and the vectoriser
+            # picklable.
             texts_list = list(texts)
-            self._tfidf_vectoriser = TfidfVectorizer(
-                tokenizer=lambda s: s.split(),
-                preprocessor=None,
-                lowercase=False,
-                norm=None,
-                token_pattern=None,
-            )
-            logger.info("Fitting TF‑IDF vectoriser on %d documents", len(texts_list))
-            # Fit vectoriser
-            self._tfidf_vectoriser.fit(texts_list)
-
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """Embed multiple texts into dense vectors.
-
-        This function batches requests where possible.  When using
-        OpenAI it will send a single API call for the entire list of
-        inputs; when falling back to TF‑IDF, it will transform them
-        using the fitted vectoriser.
+            if len(texts_list) >= _HASHING_MIN_DOCS or env_flag("RAG_HASH_VEC"):
+                self._tfidf_vectoriser = HashingVectorizer(
+                    n_features=_HASHING_FEATURES,
+                    alternate_sign=False,
+                    lowercase=False,
+                    norm=None,
+                    token_pattern=r"\S+",
+                    dtype=np.float32,
+                )
+                logger.info("Using hashing vectoriser for %d documents", len(texts_list))
+            else:
+                self._tfidf_vectoriser = TfidfVectorizer(
+                    lowercase=False,
+                    norm=None,
+                    token_pattern=r"\S+",
+                    dtype=np.float32,
+                )
+                logger.info("Fitting TF‑IDF vectoriser on %d documents", len(texts_list))
+                # Fit vectoriser
+                self._tfidf_vectoriser.fit(texts_list)
+            self._tfidf_fingerprint = corpus_fingerprint(texts_list)
+
+    def _is_hashing(self) -> bool:
+        return type(self._tfidf_vectoriser).__name__ == "HashingVectorizer"
+
+    def _transform_sparse(self, texts: List[str]) -> "csr_matrix":
+        """Vectorise ``texts`` with the fitted fallback vectoriser.
+
+        A hashing vectoriser is stateless, so large inputs are split into
+        chunks and transformed across processes with joblib.
+        """
+        if not self._is_hashing() or len(texts) < _HASHING_PARALLEL_MIN_TEXTS:
+            return self._tfidf_vectoriser.transform(texts)
+        from joblib import Parallel, delayed
+        from scipy.sparse import vstack
+
+        n_jobs = os.cpu_count() or 1
+        step = -(-len(texts) // n_jobs)
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(self._tfidf_vectoriser.transform)(texts[start:start + step])
+            for start in range(0, len(texts), step)
+        )
+        return vstack(parts, format="csr")
+
+    def ensure_fitted(self, texts: Iterable[str]) -> None:
+        """Fit the TF‑IDF fallback on ``texts`` unless it is already fitted.
+
+        This is a no-op when OpenAI embeddings are in use.
+        """
+        if not self.use_openai:
+            self._ensure_tfidf_fitted(texts)
+
+    def fit(self, texts: Iterable[str]) -> None:
+        """Fit the TF‑IDF fallback on ``texts``, replacing any previous fit.
+
+        This is a no-op when OpenAI embeddings are in use.
+        """
+        if self.use_openai:
+            return
+        self._tfidf_vectoriser = None
+        self._tfidf_fingerprint = None
+        self._ensure_tfidf_fitted(texts)
+
+    @property
+    def signature(self) -> str:
+        """Identify the vector space produced by :meth:`embed_texts`.
+
+        Vectors with different signatures are not comparable: OpenAI
+        vectors are identified by model name, TF‑IDF vectors by the
+        corpus the vectoriser was fitted on and hashed vectors, which
+        depend on no corpus, by their width.
+        """
+        if self.use_openai:
+            return self.model_name
+        if self._is_hashing():
+            return f"hashing:{_HASHING_FEATURES}"
+        return f"tfidf:{self._tfidf_fingerprint or ''}"
+
+    def save(self, path: str) -> None:
+        """Persist the fitted TF‑IDF vectoriser to ``path``.
+
+        Nothing is written when the vectoriser has not been fitted (for
+        instance when OpenAI embeddings are in use).
+        """
+        if self._tfidf_vectoriser is None:
+            return
+        payload = {
+            "fingerprint": self._tfidf_fingerprint,
+            "vectoriser": self._tfidf_vectoriser,
+        }
+        try:
+            with open(path, "wb") as fh:
+                pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            logger.warning("Failed to save TF‑IDF vectoriser to %s: %s", path, exc)
+
+    def load(self, path: str, *, fingerprint: Optional[str] = None) -> bool:
+        """Restore a TF‑IDF vectoriser saved with :meth:`save`.
+
+        Parameters
+        ----------
+        path : str
+            File written by :meth:`save`.
+        fingerprint : str, optional
+            If given, the saved vectoriser is only used when it was
+            fitted on a corpus with this :func:`corpus_fingerprint`.
+
+        Returns
+        -------
+        bool
+            ``True`` if a vectoriser was loaded.
+        """
+        if self.use_openai or not os.path.exists(path):
+            return False
+        try:
+            with open(path, "rb") as fh:
+                payload = pickle.load(fh)
+        except Exception:
+            logger.warning("Failed to load TF‑IDF vectoriser from %s; refitting.", path)
+            return False
+        if fingerprint is not None and payload.get("fingerprint") != fingerprint:
+            return False
+        self._tfidf_vectoriser = payload["vectoriser"]
+        self._tfidf_fingerprint = payload.get("fingerprint")
+        return True
+
+    def _embed_openai_batch(self, batch: List[str]) -> np.ndarray:
+        """Embed a single sub-batch with the synchronous client."""
+        response = self._client.embeddings.create(
+            model=self.model_name,
+            input=batch,
+        )
+        return _response_to_array(response)
+
+    def _token_batches(self, texts: List[str], batch_size: int) -> Iterator[Tuple[List[str], int]]:
+        """Split ``texts`` into sub-batches bounded by count and tokens.
+
+        Yields each sub-batch together with its token count.
+        """
+        count_tokens = token_counter(self.model_name)
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = count_tokens(text)
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > _EMBED_BATCH_TOKENS):
+                yield batch, batch_tokens
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch, batch_tokens
+
+    def _async_resources(self) -> Tuple["AsyncOpenAI", RateLimiter]:
+        """Return the async client and rate limiter for the running loop.
+
+        They are created on first use and kept for later calls on the
+        same loop, so connections are reused and the limiter sees every
+        request.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            from openai import AsyncOpenAI  # type: ignore
+
+            self._async_client = AsyncOpenAI(api_key=self._api_key, base_url=self._base_url)
+            self._limiter = RateLimiter(_EMBED_REQUESTS_PER_MINUTE, _EMBED_TOKENS_PER_MINUTE)
+            self._async_loop = loop
+        return self._async_client, self._limiter
+
+    async def _embed_openai_async(self, batches: List[Tuple[List[str], int]]) -> List[np.ndarray]:
+        """Embed sub-batches concurrently with the shared ``AsyncOpenAI`` client.
+
+        Requests are throttled to the endpoint's rate limits and
+        retried with back-off if they are rate limited anyway.
+        """
+        client, limiter = self._async_resources()
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+
+        async def embed(batch: List[str], tokens: int) -> np.ndarray:
+            async with semaphore:
+                await limiter.acquire(tokens)
+                response = await call_with_retry(
+                    lambda: client.embeddings.create(model=self.model_name, input=batch)
+                )
+            return _response_to_array(response)
+
+        return await asyncio.gather(*(embed(batch, tokens) for batch, tokens in batches))
+
+    def _embed_openai(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed ``texts`` with OpenAI in token-bounded sub-batches.
+
+        A single sub-batch, such as a query, is one request on the
+        synchronous client.  Several are sent concurrently on a private
+        event loop kept for the lifetime of the model.
+        """
+        batches = list(self._token_batches(texts, batch_size))
+        if len(batches) == 1:
+            return self._embed_openai_batch(batches[0][0])
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            with self._loop_lock:
+                if self._loop is None:
+                    self._loop = asyncio.new_event_loop()
+                results = self._loop.run_until_complete(self._embed_openai_async(batches))
+        else:
+            # Already inside an event loop (e.g. a notebook), where a
+            # second loop cannot run; send the batches one by one
+            # (embed_batch_async avoids this from async code)
+            results = [self._embed_openai_batch(batch) for batch, _ in batches]
+        return np.concatenate(results)
+
+    def close(self) -> None:
+        """Close the async client and event loop used for corpus embedding."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+            if loop is None:
+                return
+            if self._async_loop is loop:
+                loop.run_until_complete(self._async_client.close())
+                self._async_client = self._limiter = self._async_loop = None
+            loop.close()
+
+    def embed_texts(self, texts: List[str]) -> Union[np.ndarray, "csr_matrix"]:
+        """Embed multiple texts into vectors.
+
+        Equivalent to :meth:`embed_batch` with the default batch size.
+        """
+        return self.embed_batch(texts)
+
+    def embed_batch(
+        self,
+        texts: List[str],
+        *,
+        batch_size: int = _EMBED_BATCH_SIZE,
+    ) -> Union[np.ndarray, "csr_matrix"]:
+        """Embed a whole batch of texts with as few requests as possible.
+
+        When using OpenAI the inputs are split into sub-batches of at
+        most ``batch_size`` texts and ``_EMBED_BATCH_TOKENS`` tokens
+        (counted with ``tiktoken`` when installed) which are sent
+        concurrently; when
+        falling back to TF‑IDF, it will transform them
+        using the fitted vectoriser and return the sparse matrix
+        directly rather than materialising a dense copy.
 
         Parameters
         ----------
         texts : list of str
             The raw text of each document or query.
+        batch_size : int
+            Maximum number of texts per embeddings request.
 
         Returns
         -------
-        list of list of float
-            The embedding vectors for each text.
+        np.ndarray or scipy.sparse.csr_matrix
+            The embedding vectors for each text, one float32 row per
+            text.  OpenAI vectors are returned as a contiguous array;
+            the TF‑IDF fallback returns an L2 normalised CSR matrix.
         """
         if not texts:
-            return []
+            return np.zeros((0, 0), dtype=np.float32)
         if self.use_openai and self._client is not None:
             # call OpenAI embedding API
             try:
-                response = self._client.embeddings.create(
-                    model=self.model_name,
-                    input=texts,
-                )
+                return self._embed_openai(texts, batch_size)
             except Exception as exc:  # pragma: no cover
                 # If the API call fails, log and fall back to TF‑IDF
                 logger.error("OpenAI embedding request failed: %s; falling back to TF‑IDF", exc)
                 self.use_openai = False
                 self._client = None
-                return self.embed_texts(texts)
-            # Extract embeddings in order of input
-            # The API returns a list of dicts with index and embedding
-            ordered = sorted(response.data, key=lambda x: x.index)
-            return [item.embedding for item in ordered]
+                return self.embed_batch(texts, batch_size=batch_size)
         else:
             # Fallback to TF‑IDF embeddings
-            assert _SKLEARN_AVAILABLE
             # Make sure TF‑IDF is fitted
             # We pass the full set of texts when fitting; for queries the
             # vectoriser should already be fitted on the corpus
             if self._tfidf_vectoriser is None:
                 self._ensure_tfidf_fitted(texts)
-            vectors = self._tfidf_vectoriser.transform(texts)
-            # Normalise to unit length to simulate cosine similarity
-            vectors = normalize(vectors, norm='l2')
-            return vectors.toarray().tolist()
+            vectors = self._transform_sparse(texts)
+            # Normalise rows to unit length in place to simulate cosine
+            # similarity; the matrix stays sparse
+            return _l2_normalise_rows(vectors)
+
+    async def embed_batch_async(
+        self,
+        texts: List[str],
+        *,
+        batch_size: int = _EMBED_BATCH_SIZE,
+    ) -> Union[np.ndarray, "csr_matrix"]:
+        """Asynchronous counterpart of :meth:`embed_batch`.
+
+        Use this from code that already runs an event loop; the
+        sub-batches are sent concurrently on that loop instead of one
+        after another.  The TF‑IDF fallback runs synchronously.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.use_openai and self._client is not None:
+            try:
+                results = await self._embed_openai_async(list(self._token_batches(texts, batch_size)))
+            except Exception as exc:  # pragma: no cover
+                logger.error("OpenAI embedding request failed: %s; falling back to TF‑IDF", exc)
+                self.use_openai = False
+                self._client = None
+            else:
+                return results[0] if len(results) == 1 else np.concatenate(results)
+        return self.embed_batch(texts, batch_size=batch_size)
@@ -2,35 +2,73 @@
 
 from __future__ import annotations
 
+import functools
 import os
+import re
 from pathlib import Path
-from typing import Optional, Union
+from typing import Collection, Dict, Optional, Union
 
-_ENV_LOADED = False
+# One KEY=VALUE assignment per line, optionally preceded by ``export`` as
+# in shell scripts.  A value wrapped in matching single or double quotes
+# is unquoted; anything else is taken verbatim up to the end of the line,
+# minus surrounding blanks.  Comment and blank lines do not match.
+_ENV_LINE_RE = re.compile(
+    r"""^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*?))[ \t]*$""",
+    re.MULTILINE,
+)
 
 
-def load_env(path: Optional[Union[str, Path]] = None) -> None:
-    """Load KEY=VALUE pairs from a .env file into ``os.environ``."""
-    global _ENV_LOADED
-    if _ENV_LOADED:
-        return
-    candidate = Path(path) if path is not None else Path(__file__).resolve().parents[1] / ".env"
+_DEFAULT_ENV_PATH = Path(__file__).resolve().parents[1] / ".env"
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_env(path: str) -> Dict[str, str]:
+    """Parse the .env file at ``path`` once; a missing file yields no pairs."""
     try:
-        with candidate.open("r", encoding="utf-8") as handle:
-            for raw_line in handle:
-                line = raw_line.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip()
-                if not key:
-                    continue
-                if len(value) >= 2 and value[0] == value[-1] and value[0] in {'"', "'"}:
-                    value = value[1:-1]
-                os.environ.setdefault(key, value)
-    except FileNotFoundError:
-        pass
+        text = Path(path).read_text(encoding="utf-8")
     except OSError:
-        pass
-    _ENV_LOADED = True
+        return {}
+    return {
+        key: double_quoted or single_quoted or bare
+        for key, double_quoted, single_quoted, bare in _ENV_LINE_RE.findall(text)
+    }
+
+
+def load_env(path: Optional[Union[str, Path]] = None) -> None:
+    """Load KEY=VALUE pairs from a .env file into ``os.environ``.
+
+    Each file is parsed only once per process.  Variables that are
+    already set in the environment take precedence.
+    """
+    candidate = Path(path) if path is not None else _DEFAULT_ENV_PATH
+    for key, value in _parse_env(str(candidate)).items():
+        os.environ.setdefault(key, value)
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Return whether the environment variable ``name`` is switched on.
+
+    The ``.env`` file is loaded first, so flags such as ``RAG_PQ=1`` can
+    live alongside the API keys.  ``1``, ``true``, ``yes`` and ``on``
+    (case insensitive) count as enabled.
+    """
+    load_env()
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def env_choice(name: str, choices: Collection[str], default: str) -> str:
+    """Return the value of ``name`` if it is one of ``choices``.
+
+    Values are compared case insensitively.  Unset or unrecognised
+    values yield ``default``.
+    """
+    load_env()
+    value = os.getenv(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    return value if value in choices else default
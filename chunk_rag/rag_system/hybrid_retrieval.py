@@ -25,18 +25,21 @@ used automatically for better performance.
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
 import math
 import os
-import hashlib
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np  # type: ignore
 
+from ._arrays import _append_rows, _int8_codes
 from .embedding import EmbeddingModel
-from .rrf import reciprocal_rank_fusion
-from .utils import Document
+from .env import env_choice, env_flag
+from .cache import EmbeddingStore, minhash_signature
+from .rrf import reciprocal_rank_fusion, reciprocal_rank_fusion_array
+from .utils import Document, content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -52,12 +55,71 @@ def _documents_to_serialisable(documents: List[Document]) -> List[Dict[str, obje
     return serialised
 
 
+def _dense_float32(vectors: object) -> np.ndarray:
+    """Return embedding rows as a dense float32 array.
+
+    The TF‑IDF fallback of :class:`EmbeddingModel` yields a sparse
+    matrix; both FAISS and the brute force path need dense rows, so they
+    are materialised once here at float32 precision.
+    """
+    if hasattr(vectors, "toarray"):
+        vectors = vectors.toarray()
+    return np.asarray(vectors, dtype='float32')
+
+
+def _json_dump(payload: object, path: str) -> None:
+    """Write ``payload`` as JSON, using ``orjson`` when it is installed."""
+    if _ORJSON_AVAILABLE:
+        with open(path, "wb") as fh:
+            fh.write(orjson.dumps(payload))
+    else:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+
+
+def _json_load(path: str) -> object:
+    """Read JSON written by :func:`_json_dump`."""
+    if _ORJSON_AVAILABLE:
+        with open(path, "rb") as fh:
+            return orjson.loads(fh.read())
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+_MANIFEST_FILE = "manifest.json"
+_FAISS_INDEX_FILE = "faiss.index"
+# Content addressed embedding cache kept in ``cache_dir``
+_EMBEDDING_STORE_FILE = "embeddings.sqlite"
+
+
+def _read_manifest(directory: str) -> Optional[Dict[str, object]]:
+    path = os.path.join(directory, _MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        return _json_load(path)
+    except Exception:
+        logger.warning("Ignoring unreadable manifest %s.", path)
+        return None
+
+
+def _write_manifest(directory: str, manifest: Dict[str, object]) -> None:
+    # written last and renamed into place, so a crash mid-save leaves
+    # the previous manifest describing files that still exist
+    path = os.path.join(directory, _MANIFEST_FILE)
+    _json_dump(manifest, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
 def _documents_from_serialised(payload: List[Dict[str, object]]) -> List[Document]:
     """Recreate Document objects from saved JSON."""
     documents: List[Document] = []
     for item in payload:
         content = item.get("content", "")
         metadata = item.get("metadata", {})
+        if isinstance(metadata.get("tags"), list):
+            # JSON has no tuples; restore the loader's representation
+            metadata["tags"] = tuple(metadata["tags"])
         documents.append(Document(content=content, metadata=metadata))
     return documents
 
@@ -70,6 +132,13 @@ except ImportError:  # pragma: no cover
     BM25Okapi = None  # type: ignore
     _BM25_AVAILABLE = False
 
+try:
+    import orjson  # type: ignore
+    _ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+    _ORJSON_AVAILABLE = False
+
 try:
     import faiss  # type: ignore
     _FAISS_AVAILABLE = True
@@ -77,12 +146,281 @@ except ImportError:  # pragma: no cover
     faiss = None  # type: ignore
     _FAISS_AVAILABLE = False
 
-try:
-    from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
-    _SKLEARN_COSINE_AVAILABLE = True
-except ImportError:  # pragma: no cover
-    cosine_similarity = None  # type: ignore
-    _SKLEARN_COSINE_AVAILABLE = False
+# FAISS index parameters.  Small corpora are searched exactly with a
+# flat inner product index (a single BLAS call per query).  From
+# ``_HNSW_MIN_VECTORS`` HNSW gives sub-linear graph search without a
+# training step; beyond ``_IVF_MIN_VECTORS`` an inverted file with an
+# HNSW coarse quantiser keeps build time and query latency in check.
+_HNSW_MIN_VECTORS = 10_000
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 128
+_IVF_MIN_VECTORS = 100_000
+# Product quantisation (opt in via ``RAG_PQ=1``) stores each vector as
+# ``_PQ_M`` one-byte codes instead of ``4 * D`` bytes.  Codebooks need a
+# reasonable number of training points, so small corpora stay exact.
+_PQ_M = 16
+_PQ_NBITS = 8
+# FAISS wants at least this many training points per k-means centroid.
+_MIN_POINTS_PER_CENTROID = 39
+_PQ_MIN_VECTORS = _MIN_POINTS_PER_CENTROID * 2 ** _PQ_NBITS
+_TRAIN_SAMPLE = 10_000
+# Candidate pools at least this large are fused with the NumPy RRF; for
+# smaller ones the dictionary version is quicker.
+_ARRAY_RRF_MIN_CANDIDATES = 256
+# Search-time parameters applied to indexes built from an explicit
+# ``index_type`` factory string.
+_FACTORY_SEARCH_PARAMS = (("nprobe", 16), ("efSearch", 64))
+# Storage precision of uncompressed indexes (``RAG_VECTOR_DTYPE``).
+# Search is memory bound, so fp16 or int8 scalar quantisation speeds
+# queries up roughly in proportion to the bytes saved.
+_SCALAR_QUANTIZERS = {"float16": "QT_fp16", "int8": "QT_8bit"}
+_VECTOR_DTYPES = ("float32",) + tuple(_SCALAR_QUANTIZERS)
+
+
+def _vector_dtype() -> str:
+    return env_choice("RAG_VECTOR_DTYPE", _VECTOR_DTYPES, "float32")
+
+
+def _faiss_threads() -> Optional[int]:
+    """FAISS OpenMP pool size from ``RAG_FAISS_THREADS``, if set to a positive int."""
+    value = os.getenv("RAG_FAISS_THREADS", "").strip()
+    if not value:
+        return None
+    try:
+        threads = int(value)
+    except ValueError:
+        logger.warning("Ignoring RAG_FAISS_THREADS=%r; expected a positive integer.", value)
+        return None
+    return threads if threads > 0 else None
+
+
+def _num_gpus() -> int:
+    """Number of GPUs FAISS can use (0 for CPU-only builds)."""
+    if not hasattr(faiss, "get_num_gpus"):
+        return 0
+    return faiss.get_num_gpus()
+
+
+def _gpu_requested() -> bool:
+    """Whether FAISS indexes should be moved to the GPU when possible.
+
+    Only ``RAG_USE_GPU`` opts in; a visible GPU or a scheduler-set
+    ``CUDA_VISIBLE_DEVICES`` alone does not.
+    """
+    return env_flag("RAG_USE_GPU")
+
+
+def _to_gpu(index: "faiss.Index") -> "faiss.Index":
+    """Return ``index`` cloned onto all visible GPUs, or unchanged.
+
+    CPU-only FAISS builds, machines without a GPU and index types the
+    GPU backend does not support (such as HNSW) keep the CPU index.
+    """
+    if not hasattr(faiss, "index_cpu_to_all_gpus") or _num_gpus() == 0:
+        return index
+    try:
+        return faiss.index_cpu_to_all_gpus(index)
+    except Exception as exc:
+        logger.warning("Could not move FAISS index to GPU (%s); searching on CPU.", exc)
+        return index
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokenize(query: str) -> Tuple[str, ...]:
+    """Whitespace-tokenise ``query``, memoised for repeated queries."""
+    return tuple(query.split())
+
+
+@functools.lru_cache(maxsize=None)
+def _load_bm25_kernel() -> Optional[Callable[..., np.ndarray]]:
+    """Return a compiled BM25 kernel, or ``None`` to score with numpy.
+
+    The numba kernel is preferred.  Failing that, the Cython kernel from
+    ``_bm25.pyx`` is used if it was compiled when the package was built
+    (see ``setup.py``); nothing is compiled at query time.
+    """
+    try:
+        from ._bm25_numba import bm25_accumulate
+        return bm25_accumulate
+    except ImportError:
+        pass
+    try:
+        from ._bm25 import bm25_accumulate
+    except ImportError:
+        return None
+    return bm25_accumulate
+
+
+def _l2_normalise_inplace(vectors: np.ndarray) -> np.ndarray:
+    """L2 normalise the rows of ``vectors`` in place; zero rows stay zero."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors
+
+
+def _merge_postings(
+    older: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    newer: Tuple[np.ndarray, np.ndarray, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge two CSR postings segments ``(ptr, docs, freqs)``.
+
+    Every document in ``newer`` must come after those in ``older`` and
+    ``newer`` must cover at least as many terms, so each term's merged
+    postings are its older postings followed by its newer ones.
+    """
+    old_ptr, new_ptr = older[0], newer[0]
+    num_terms = len(new_ptr) - 1
+    old_counts = np.zeros(num_terms, dtype=np.int64)
+    old_counts[:len(old_ptr) - 1] = np.diff(old_ptr)
+    new_counts = np.diff(new_ptr)
+    ptr = np.zeros(num_terms + 1, dtype=np.int64)
+    np.cumsum(old_counts + new_counts, out=ptr[1:])
+    docs = np.empty(ptr[-1], dtype=np.int32)
+    freqs = np.empty(ptr[-1], dtype=np.int32)
+    old_terms = np.repeat(np.arange(num_terms), old_counts)
+    dest = ptr[old_terms] + np.arange(len(old_terms)) - old_ptr[old_terms]
+    docs[dest], freqs[dest] = older[1], older[2]
+    new_terms = np.repeat(np.arange(num_terms), new_counts)
+    dest = ptr[new_terms] + old_counts[new_terms] + np.arange(len(new_terms)) - new_ptr[new_terms]
+    docs[dest], freqs[dest] = newer[1], newer[2]
+    return ptr, docs, freqs
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Return the indices of the ``top_k`` largest scores, best first.
+
+    ``np.argpartition`` selects the candidates in linear time, so only
+    those ``top_k`` entries are sorted.
+    """
+    scores = np.asarray(scores)
+    top_k = min(top_k, scores.shape[0])
+    if top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k < scores.shape[0]:
+        idx = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        idx = np.arange(scores.shape[0])
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def _training_sample(vectors: np.ndarray, size: int) -> np.ndarray:
+    """Return at most ``size`` rows of ``vectors`` chosen at random."""
+    if vectors.shape[0] <= size:
+        return vectors
+    rng = np.random.default_rng(0)
+    rows = rng.choice(vectors.shape[0], size=size, replace=False)
+    return vectors[np.sort(rows)]
+
+
+def build_faiss_index(
+    vectors: np.ndarray,
+    *,
+    compress: Optional[bool] = None,
+    vector_dtype: Optional[str] = None,
+    use_gpu: Optional[bool] = None,
+    index_type: Optional[str] = None,
+    normalised: bool = False,
+) -> "faiss.Index":
+    """Build an approximate nearest neighbour index over ``vectors``.
+
+    ``vectors`` must be a float32 array of shape (N, D).  It is L2
+    normalised in place so that inner product search is equivalent to
+    cosine similarity, unless ``normalised`` says the rows already have
+    unit length.  Corpora below ``_HNSW_MIN_VECTORS`` use an exact
+    ``IndexFlatIP``, those below ``_IVF_MIN_VECTORS`` an
+    ``IndexHNSWFlat`` graph, and larger ones an ``IndexIVFFlat`` with
+    ``sqrt(N)`` lists and an HNSW quantiser.
+
+    ``vector_dtype`` (defaulting to the ``RAG_VECTOR_DTYPE`` environment
+    variable) selects how those indexes store vectors: ``"float32"``
+    keeps them exact, while ``"float16"`` and ``"int8"`` use the
+    matching FAISS scalar quantiser to halve or quarter memory.
+
+    When ``compress`` is true (defaulting to the ``RAG_PQ`` environment
+    flag) an ``IndexIVFPQ`` is built instead, trained on a sample of
+    ``_TRAIN_SAMPLE`` vectors, or 39 per inverted list when that is more.  This falls back to the
+    uncompressed index if the corpus is too small to train codebooks or
+    the dimension is not divisible by ``_PQ_M``.
+
+    ``index_type`` overrides all of the above with a
+    :func:`faiss.index_factory` description such as ``"HNSW32"`` or
+    ``"IVF4096,PQ32"``.  Such indexes are trained on all vectors when
+    required and searched with ``nprobe=16`` / ``efSearch=64`` where
+    those parameters apply.
+
+    When ``use_gpu`` is true and FAISS was built with GPU support, the
+    index is cloned onto all visible GPUs before the vectors are added,
+    so both ingestion and search run on the device.  By default this
+    happens only when ``RAG_USE_GPU`` is set (see :func:`_gpu_requested`).
+    """
+    if not _FAISS_AVAILABLE:
+        raise RuntimeError("faiss is not installed; cannot build a vector index.")
+    if compress is None:
+        compress = env_flag("RAG_PQ")
+    if vector_dtype is None:
+        vector_dtype = _vector_dtype()
+    qtype = None
+    if vector_dtype in _SCALAR_QUANTIZERS:
+        qtype = getattr(faiss.ScalarQuantizer, _SCALAR_QUANTIZERS[vector_dtype])
+    metric = faiss.METRIC_INNER_PRODUCT
+    num_vectors, dim = vectors.shape
+    if not normalised:
+        faiss.normalize_L2(vectors)
+    if compress and (num_vectors < _PQ_MIN_VECTORS or dim % _PQ_M):
+        logger.info(
+            "Skipping product quantisation for %d vectors of dimension %d.",
+            num_vectors,
+            dim,
+        )
+        compress = False
+    if index_type is not None:
+        index = faiss.index_factory(dim, index_type, metric)
+        if not index.is_trained:
+            index.train(vectors)
+        params = faiss.ParameterSpace()
+        for name, value in _FACTORY_SEARCH_PARAMS:
+            try:
+                params.set_index_parameter(index, name, value)
+            except RuntimeError:
+                # not an IVF / HNSW index
+                pass
+    elif compress:
+        nlist = int(math.sqrt(num_vectors))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, _PQ_M, _PQ_NBITS, metric)
+        # the coarse quantiser needs enough points for all nlist centroids
+        index.train(_training_sample(vectors, max(_TRAIN_SAMPLE, _MIN_POINTS_PER_CENTROID * nlist)))
+        index.nprobe = max(1, nlist // 10)
+    elif num_vectors >= _IVF_MIN_VECTORS:
+        nlist = int(math.sqrt(num_vectors))
+        quantizer = faiss.IndexHNSWFlat(dim, _HNSW_M, metric)
+        if qtype is None:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, qtype, metric)
+        index.train(vectors)
+        index.nprobe = max(1, nlist // 10)
+        quantizer.hnsw.efSearch = index.nprobe * 4
+    elif num_vectors >= _HNSW_MIN_VECTORS:
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dim, _HNSW_M, metric)
+        else:
+            index = faiss.IndexHNSWSQ(dim, qtype, _HNSW_M, metric)
+        index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+    elif qtype is None:
+        index = faiss.IndexFlatIP(dim)
+    else:
+        index = faiss.IndexScalarQuantizer(dim, qtype, metric)
+    if not index.is_trained:
+        # scalar quantisers only need the per-dimension value range
+        index.train(_training_sample(vectors, _TRAIN_SAMPLE))
+    if use_gpu is None:
+        use_gpu = _gpu_requested()
+    if use_gpu:
+        index = _to_gpu(index)
+    index.add(vectors)
+    return index
 
 
 class LexicalRetriever:
@@ -104,8 +442,9 @@ class LexicalRetriever:
         heavy dependencies that may not be available in restricted
         environments.
         """
-        # store documents and their tokenised forms
-        self.documents = documents
+        # store documents and their tokenised forms; the list is copied
+        # so add_documents cannot extend a caller's list a second time
+        self.documents = list(documents)
         self.corpus_tokens: List[List[str]] = [doc.content.split() for doc in documents]
         if _BM25_AVAILABLE:
             self.bm25 = BM25Okapi(self.corpus_tokens)
@@ -115,42 +454,118 @@ class LexicalRetriever:
             # Build our own BM25 statistics
             self._build_bm25_stats()
 
-    # For the fallback BM25 we precompute IDF and term frequencies
+    # For the fallback BM25 we precompute IDF and an inverted index
     def _build_bm25_stats(self) -> None:
+        """Build the postings and per-document statistics for BM25.
+
+        Terms are mapped to integer ids in ``self.vocab``.  Postings are
+        stored in CSR segments ``(ptr, docs, freqs)``: within a segment
+        the postings of term ``t`` are ``docs[ptr[t]:ptr[t + 1]]`` (the
+        documents containing it, ascending) with matching counts in
+        ``freqs``.  ``K_base`` holds the length normalisation
+        ``k1 * (1 - b + b * len / avgdl)`` of every document so scoring
+        is pure array arithmetic.
+        """
         # BM25 parameters
         self.k1 = 1.5
         self.b = 0.75
-        self.doc_lens: List[int] = [len(tokens) for tokens in self.corpus_tokens]
-        self.avgdl = sum(self.doc_lens) / max(1, len(self.doc_lens))
-        # document frequency per term
-        import collections
-        df = collections.Counter()
-        for tokens in self.corpus_tokens:
-            unique_tokens = set(tokens)
-            for t in unique_tokens:
-                df[t] += 1
-        # compute IDF using BM25 formula
-        N = len(self.corpus_tokens)
-        self.idf: Dict[str, float] = {}
-        for term, f in df.items():
-            # plus 0.5 to avoid division by zero
-            self.idf[term] = math.log((N - f + 0.5) / (f + 0.5) + 1)
-        # term frequencies per document
-        self.tf: List[Dict[str, int]] = []
-        for tokens in self.corpus_tokens:
-            tf_doc: Dict[str, int] = {}
-            for t in tokens:
-                tf_doc[t] = tf_doc.get(t, 0) + 1
-            self.tf.append(tf_doc)
+        self.vocab: Dict[str, int] = {}
+        self._df = np.zeros(0, dtype=np.int64)
+        self.doc_lens = np.zeros(0, dtype=np.int32)
+        self._segments: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._index_bm25(self.corpus_tokens)
+
+    def _index_bm25(self, new_tokens: List[List[str]]) -> None:
+        """Add postings for ``new_tokens`` and refresh IDF and ``K_base``.
+
+        The new documents get their own postings segment, so the cost is
+        proportional to the new tokens; segments are merged as they
+        accumulate (see :func:`_merge_postings`).
+        """
+        offset = len(self.doc_lens)
+        # one dictionary pass maps tokens to ids; everything after that
+        # is array work
+        setdefault = self.vocab.setdefault
+        tok_ids = np.fromiter(
+            (setdefault(t, len(self.vocab)) for tokens in new_tokens for t in tokens),
+            dtype=np.int64,
+        )
+        num_terms = len(self.vocab)
+        new_lens = np.fromiter((len(tokens) for tokens in new_tokens), dtype=np.int32,
+                               count=len(new_tokens))
+        doc_of = np.repeat(np.arange(offset, offset + len(new_tokens), dtype=np.int64), new_lens)
+        # sorting the (term, document) keys groups the postings by term
+        # with documents ascending; the counts are the term frequencies
+        stride = max(offset + len(new_tokens), 1)
+        keys, freqs = np.unique(tok_ids * stride + doc_of, return_counts=True)
+        post_terms = keys // stride
+        counts = np.bincount(post_terms, minlength=num_terms)
+        ptr = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=ptr[1:])
+        self._add_segment(
+            (ptr, (keys - post_terms * stride).astype(np.int32), freqs.astype(np.int32))
+        )
+        df = np.zeros(num_terms, dtype=np.int64)
+        df[:len(self._df)] = self._df
+        self._df = df + counts
+        self.doc_lens = np.concatenate([self.doc_lens, new_lens])
+        N = len(self.doc_lens)
+        self.avgdl = float(self.doc_lens.mean()) if N else 0.0
+        # compute IDF using BM25 formula (plus 0.5 to avoid division by zero)
+        self.idf_arr = np.log((N - self._df + 0.5) / (self._df + 0.5) + 1).astype(np.float32)
+        self.K_base = (
+            self.k1 * (1 - self.b + self.b * self.doc_lens / max(self.avgdl, 1e-9))
+        ).astype(np.float32)
+
+    def _add_segment(self, segment: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+        segments = self._segments
+        segments.append(segment)
+        # Merge while the newest segment is at least as large as the one
+        # before it.  Segment sizes then shrink geometrically, so there
+        # are O(log N) of them and each posting is copied O(log N) times.
+        while len(segments) > 1 and len(segments[-1][1]) >= len(segments[-2][1]):
+            newer = segments.pop()
+            segments.append(_merge_postings(segments.pop(), newer))
+
+    def _bm25_scores(self, tokens: Sequence[str]) -> np.ndarray:
+        """Score every document against ``tokens`` with the fallback BM25.
 
+        Uses a compiled kernel (see :func:`_load_bm25_kernel`) when one
+        is available and numpy otherwise.  Every postings segment adds
+        into one score array, touching only the postings of the query
+        terms.
+        """
+        num_docs = len(self.corpus_tokens)
+        qids = np.asarray([self.vocab[t] for t in tokens if t in self.vocab], dtype=np.int64)
+        scores = np.zeros(num_docs, dtype=np.float32)
+        kernel = _load_bm25_kernel()
+        for ptr, post_docs, post_freqs in self._segments:
+            # terms first seen after this segment have no postings in it
+            seg_qids = qids[qids < len(ptr) - 1]
+            if not len(seg_qids):
+                continue
+            if kernel is not None:
+                kernel(
+                    seg_qids, self.idf_arr, ptr, post_docs, post_freqs, self.K_base,
+                    np.float32(self.k1), scores,
+                )
+                continue
+            for tid in seg_qids:
+                lo, hi = ptr[tid], ptr[tid + 1]
+                docs = post_docs[lo:hi]
+                f = post_freqs[lo:hi].astype(np.float32)
+                # each document appears once per postings list, so plain
+                # fancy-index accumulation is safe
+                scores[docs] += self.idf_arr[tid] * (f * (self.k1 + 1)) / (f + self.K_base[docs])
+        return scores
 
     def add_documents(self, new_documents: List[Document]) -> None:
         """Add new documents to the lexical index.
 
-        When using BM25 this simply appends new tokenised documents to
-        the corpus; when using TF‑IDF the entire matrix is rebuilt.  If
-        you expect to add documents often at runtime you may want to
-        install the ``rank_bm25`` package.
+        The fallback BM25 indexes only the new documents and refreshes
+        its IDF and length normalisation arrays.  ``BM25Okapi`` has no
+        incremental update, so with ``rank_bm25`` the index is rebuilt
+        over the whole corpus.
         """
         if not new_documents:
             return
@@ -161,37 +576,23 @@ class LexicalRetriever:
             # rebuild BM25Okapi index
             self.bm25 = BM25Okapi(self.corpus_tokens)
         else:
-            # rebuild fallback statistics
-            self._build_bm25_stats()
+            self._index_bm25(new_tokens)
 
     def retrieve(self, query: str, top_k: int = 10) -> List[int]:
         """Return the indices of the top ``top_k`` documents.
 
         The returned list contains indices into ``self.documents``.
         """
-        if not query.strip():
+        tokens = _tokenize(query)
+        if not tokens:
             return []
-        tokens = query.split()
         if self.use_bm25_library:
             scores = self.bm25.get_scores(tokens)
-            ranked = np.argsort(scores)[::-1][:top_k]
-            return ranked.tolist()
+            return _top_k_indices(scores, top_k).tolist()
         else:
             # fallback BM25
-            scores: List[float] = []
-            for i, (tf_doc, doc_len) in enumerate(zip(self.tf, self.doc_lens)):
-                score = 0.0
-                for t in tokens:
-                    if t not in tf_doc:
-                        continue
-                    idf = self.idf.get(t, 0.0)
-                    f = tf_doc[t]
-                    numerator = f * (self.k1 + 1)
-                    denom = f + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * (numerator / denom)
-                scores.append(score)
-            ranked = np.argsort(scores)[::-1][:top_k]
-            return ranked.tolist()
+            scores = self._bm25_scores(tokens)
+            return _top_k_indices(scores, top_k).tolist()
 
 
 class VectorRetriever:
@@ -199,65 +600,114 @@ class VectorRetriever:
 
     The retriever holds a list of embeddings for each document chunk
     and supports nearest neighbour queries using either a FAISS index
-    (recommended) or, if FAISS is unavailable, brute force cosine
-    similarity via numpy or scikit‑learn.
+    (recommended, see :func:`build_faiss_index`) or, if FAISS is
+    unavailable, brute force cosine similarity via numpy.
+
+    ``index_type`` is an optional :func:`faiss.index_factory` string
+    that replaces the automatically chosen FAISS index.  ``threads``
+    (or the ``RAG_FAISS_THREADS`` environment variable) sets the size of
+    FAISS's OpenMP pool, e.g. to avoid oversubscribing a container
+    where FAISS would claim every core it can detect.  The pool is
+    process wide, so without either setting FAISS's default is left
+    alone.  Indexes move to the GPU when ``RAG_USE_GPU`` is set
+    and one is available (see :func:`build_faiss_index`).  Without FAISS,
+    ``RAG_VECTOR_DTYPE`` selects how the normalised vectors are stored:
+    ``float16`` halves and ``int8`` quarters the memory each brute
+    force query reads, with float32 accumulation in both cases.  numpy
+    has no fast half-precision or int8 kernels, so this trades some
+    per-query compute for memory.
+
+    Pass ``normalised=True`` (to the constructor and
+    :meth:`add_embeddings`) when the embeddings already have unit
+    length; they are then neither copied nor normalised again.
     """
 
-    def __init__(self, embeddings: np.ndarray):
-        # embeddings is of shape (N, D)
-        self.embeddings = embeddings.astype('float32')
-        self.num_vectors, self.dim = self.embeddings.shape
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        *,
+        index_type: Optional[str] = None,
+        threads: Optional[int] = None,
+        normalised: bool = False,
+    ):
+        # embeddings is of shape (N, D).  Unless the caller guarantees
+        # unit-length rows they are copied, because both paths normalise
+        # the vectors in place.
+        if normalised:
+            vectors = np.ascontiguousarray(embeddings, dtype='float32')
+        else:
+            vectors = np.array(embeddings, dtype='float32')
+        self.num_vectors, self.dim = vectors.shape
+        if threads is None:
+            threads = _faiss_threads()
+        if _FAISS_AVAILABLE and threads is not None:
+            # the pool is process wide, so this also affects searches
+            # of every other index
+            faiss.omp_set_num_threads(threads)
         if _FAISS_AVAILABLE and self.num_vectors > 0:
-            # build a simple L2 index; we normalise vectors to unit
-            # length so L2 and cosine distance are equivalent
-            self.index = faiss.IndexFlatIP(self.dim)
-            # normalise vectors
-            faiss.normalize_L2(self.embeddings)
-            self.index.add(self.embeddings)
+            # vectors are normalised in place so inner product search
+            # is equivalent to cosine similarity.  The index owns the
+            # vectors, so no separate copy is kept.
+            self.index = build_faiss_index(
+                vectors, index_type=index_type, normalised=normalised
+            )
             self.use_faiss = True
         else:
+            # We'll fall back to manual dot products with normalisation
             self.use_faiss = False
-            # ensure scikit or numpy is available
-            if not _SKLEARN_COSINE_AVAILABLE:
-                # We'll fall back to manual dot products with normalisation
-                pass
-        # Precompute norms for brute force cosine
-        if not self.use_faiss:
-            # normalise embeddings to unit length to accelerate dot product
-            norm = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
-            norm[norm == 0] = 1
-            self.normalised = self.embeddings / norm
-
-    def add_embeddings(self, new_embeddings: np.ndarray) -> None:
+            # Normalised rows live in a buffer that grows geometrically,
+            # so appending only has to normalise the new rows
+            self._storage = _vector_dtype()
+            self._quantised = self._storage == "int8"
+            self._normalised = vectors if normalised else _l2_normalise_inplace(vectors)
+            if self._storage == "float16":
+                self._normalised = self._normalised.astype(np.float16)
+            elif self._quantised:
+                self._normalised, self._code_scales = _int8_codes(self._normalised)
+
+    @classmethod
+    def from_index(cls, index: "faiss.Index") -> "VectorRetriever":
+        """Wrap an existing FAISS index, e.g. one read from disk."""
+        instance = cls.__new__(cls)
+        instance.index = index
+        instance.use_faiss = True
+        instance.num_vectors = index.ntotal
+        instance.dim = index.d
+        return instance
+
+    @property
+    def normalised(self) -> np.ndarray:
+        """Unit length copies of the stored vectors (fallback path only).
+
+        These are float16 or int8 codes according to ``RAG_VECTOR_DTYPE``.
+        """
+        return self._normalised[:self.num_vectors]
+
+    def add_embeddings(self, new_embeddings: np.ndarray, *, normalised: bool = False) -> None:
         """Add new embeddings to the vector index.
 
         When using FAISS the embeddings are appended to the existing
-        index; otherwise they are concatenated to the internal arrays.
+        index; otherwise they are normalised and written to the end of
+        the internal buffer, which doubles in size when full.
         """
         if new_embeddings.size == 0:
             return
-        new_embeddings = new_embeddings.astype('float32')
+        if normalised:
+            new_embeddings = np.ascontiguousarray(new_embeddings, dtype='float32')
+        else:
+            new_embeddings = _l2_normalise_inplace(np.array(new_embeddings, dtype='float32'))
         if self.use_faiss:
-            # Normalise new embeddings and add to index
-            faiss.normalize_L2(new_embeddings)
             self.index.add(new_embeddings)
-            # Keep a copy so we can save the index later if needed
-            self.embeddings = np.vstack([self.embeddings, new_embeddings]) if self.embeddings.size else new_embeddings
-            self.num_vectors = self.embeddings.shape[0]
-            if self.num_vectors:
-                self.dim = self.embeddings.shape[1]
-        else:
-            # Extend internal arrays
-            if self.embeddings.size == 0:
-                self.embeddings = new_embeddings
-            else:
-                self.embeddings = np.vstack([self.embeddings, new_embeddings])
-            # Recompute normalised vectors
-            norm = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
-            norm[norm == 0] = 1
-            self.normalised = self.embeddings / norm
-            self.num_vectors = self.embeddings.shape[0]
-            self.dim = self.embeddings.shape[1] if self.num_vectors else 0
+            self.num_vectors += new_embeddings.shape[0]
+            return
+        size = self.num_vectors
+        rows = new_embeddings
+        if self._quantised:
+            rows, scales = _int8_codes(rows)
+            self._code_scales = _append_rows(self._code_scales, size, scales)
+        self._normalised = _append_rows(self._normalised, size, rows)
+        self.num_vectors = size + len(rows)
+        self.dim = self._normalised.shape[1]
 
     def query(self, query_embedding: np.ndarray, top_k: int = 10) -> List[int]:
         """Return indices of the nearest vectors to the query embedding.
@@ -281,21 +731,79 @@ class VectorRetriever:
         if q.ndim == 1:
             q = q.reshape(1, -1)
         if self.use_faiss:
+            # A zero query (e.g. only out-of-vocabulary terms) has no
+            # meaningful neighbours; match the brute force behaviour
+            if not np.any(q):
+                return []
             # Normalise query embedding
             faiss.normalize_L2(q)
             sims, ids = self.index.search(q, top_k)
-            # ids is (1, top_k)
-            return ids[0].tolist()
+            # ids is (1, top_k); approximate indices pad missing
+            # neighbours with -1
+            return [idx for idx in ids[0].tolist() if idx >= 0]
         else:
             # compute cosine similarity with brute force
-            # normalise query
+            # normalise query; a 1-D float32 query against the
+            # C-contiguous float32 buffer dispatches a single BLAS sgemv
+            q = q.reshape(-1)
             norm = np.linalg.norm(q)
             if norm == 0:
                 return []
-            q_norm = q / norm
-            sims = np.dot(self.normalised, q_norm.T).flatten()
-            ranked = np.argsort(sims)[::-1][:top_k]
-            return ranked.tolist()
+            q /= norm
+            if self._quantised:
+                # integer dot products against the int8 codes; the query
+                # scale is common to all rows so only row scales matter
+                q_codes, _ = _int8_codes(q[None, :])
+                dots = np.einsum('nd,d->n', self.normalised, q_codes[0], dtype=np.int32)
+                sims = dots * self._code_scales[:self.num_vectors]
+            elif self._storage == "float16":
+                # half precision rows, single precision accumulation
+                sims = np.einsum('nd,d->n', self.normalised, q, dtype=np.float32)
+            else:
+                sims = self.normalised @ q
+            return _top_k_indices(sims, top_k).tolist()
+
+    def query_batch(self, query_embeddings: np.ndarray, top_k: int = 10) -> List[List[int]]:
+        """Return the nearest neighbour indices for each row of ``query_embeddings``.
+
+        With FAISS all queries go through a single ``search`` call, which
+        is far more efficient than one call per query.  The brute force
+        path likewise scores the whole batch with one matrix product
+        (SGEMM) rather than one matrix-vector product per query.
+        """
+        q = np.array(query_embeddings, dtype='float32', ndmin=2)
+        if self.num_vectors == 0:
+            return [[] for _ in range(q.shape[0])]
+        nonzero = np.any(q, axis=1)
+        if self.use_faiss:
+            faiss.normalize_L2(q)
+            _, ids = self.index.search(q, top_k)
+            return [
+                [idx for idx in row if idx >= 0] if keep else []
+                for row, keep in zip(ids.tolist(), nonzero.tolist())
+            ]
+        _l2_normalise_inplace(q)
+        if self._quantised:
+            q_codes, _ = _int8_codes(q)
+            dots = np.einsum('nd,bd->bn', self.normalised, q_codes, dtype=np.int32)
+            sims = dots * self._code_scales[:self.num_vectors]
+        elif self._storage == "float16":
+            sims = np.einsum('nd,bd->bn', self.normalised, q, dtype=np.float32)
+        else:
+            sims = q @ self.normalised.T
+        top_k = min(top_k, self.num_vectors)
+        if top_k <= 0:
+            return [[] for _ in range(q.shape[0])]
+        if top_k < self.num_vectors:
+            idx = np.argpartition(-sims, top_k - 1, axis=1)[:, :top_k]
+        else:
+            idx = np.broadcast_to(np.arange(self.num_vectors), sims.shape)
+        order = np.argsort(-np.take_along_axis(sims, idx, axis=1), axis=1, kind="stable")
+        ranked = np.take_along_axis(idx, order, axis=1)
+        return [
+            row if keep else []
+            for row, keep in zip(ranked.tolist(), nonzero.tolist())
+        ]
 
 
 class HybridRetriever:
@@ -312,18 +820,23 @@ class HybridRetriever:
         embedder: EmbeddingModel,
         *,
         cache_dir: Optional[str] = None,
+        index_type: Optional[str] = None,
     ):
         # Keep a flat list of document chunks
         self.documents: List[Document] = list(documents)
         self.embedder = embedder
         self.cache_dir = cache_dir
+        self.index_type = index_type
+        self._index_tags(self.documents)
         if self.cache_dir:
             os.makedirs(self.cache_dir, exist_ok=True)
         # Create embeddings for all documents, leveraging cache if available
         self.embeddings = self._embeddings_from_documents(self.documents)
         # Build retrievers
         self.lexical_retriever = LexicalRetriever(self.documents)
-        self.vector_retriever = VectorRetriever(self.embeddings)
+        self.vector_retriever = VectorRetriever(
+            self.embeddings, index_type=index_type, normalised=True
+        )
 
     @classmethod
     def load(
@@ -332,8 +845,15 @@ class HybridRetriever:
         embedder: Optional[EmbeddingModel] = None,
         *,
         cache_dir: Optional[str] = None,
+        index_type: Optional[str] = None,
     ) -> "HybridRetriever":
-        """Load a previously saved retriever from ``directory``."""
+        """Load a previously saved retriever from ``directory``.
+
+        Segments written by :meth:`append_to_disk` are loaded after the
+        base files.  A saved FAISS index is reused when it covers every
+        vector and no ``index_type`` is requested; otherwise the index is
+        rebuilt from the embeddings.
+        """
         docs_path = os.path.join(directory, "documents.json")
         embeddings_path = os.path.join(directory, "embeddings.npy")
         if not os.path.exists(docs_path) or not os.path.exists(embeddings_path):
@@ -342,116 +862,163 @@ class HybridRetriever:
             )
         if embedder is None:
             embedder = EmbeddingModel()
-        with open(docs_path, "r", encoding="utf-8") as fh:
-            payload = json.load(fh)
+            # Restore the TF‑IDF vocabulary the saved vectors were built with
+            embedder.load(os.path.join(directory, "embedder.pkl"))
+        manifest = _read_manifest(directory)
+        payload = _json_load(docs_path)
         documents_data = payload.get("documents", [])
         documents = _documents_from_serialised(documents_data)
-        embeddings = np.load(embeddings_path)
+        # Memory-map the matrix: the retrievers make their own
+        # normalised copy, so reading it into RAM here would double the
+        # peak footprint
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+        segments = manifest.get("segments", []) if manifest else []
+        if segments:
+            parts = [embeddings]
+            for segment in segments:
+                segment_docs = _json_load(os.path.join(directory, segment["documents"]))
+                documents.extend(_documents_from_serialised(segment_docs.get("documents", [])))
+                parts.append(np.load(os.path.join(directory, segment["embeddings"])))
+            embeddings = np.concatenate(parts)
+        if not (manifest and manifest.get("normalised")):
+            # saved before embeddings were normalised on ingest
+            embeddings = _l2_normalise_inplace(np.array(embeddings, dtype='float32'))
         instance = cls.__new__(cls)
         instance.documents = documents
-        instance.embeddings = embeddings.astype('float32')
+        instance.embeddings = embeddings if embeddings.dtype == np.float32 else embeddings.astype('float32')
         instance.embedder = embedder
+        instance._index_tags(instance.documents)
         instance.lexical_retriever = LexicalRetriever(instance.documents)
-        instance.vector_retriever = VectorRetriever(instance.embeddings)
+        instance.index_type = index_type
+        index = None
+        faiss_path = os.path.join(directory, _FAISS_INDEX_FILE)
+        if _FAISS_AVAILABLE and index_type is None and manifest and manifest.get("faiss_index"):
+            try:
+                index = faiss.read_index(faiss_path)
+            except Exception as exc:
+                logger.warning("Failed to read %s (%s); rebuilding the vector index.", faiss_path, exc)
+            if index is not None and index.ntotal != len(instance.embeddings):
+                index = None
+        if index is not None:
+            if _gpu_requested():
+                index = _to_gpu(index)
+            instance.vector_retriever = VectorRetriever.from_index(index)
+        else:
+            instance.vector_retriever = VectorRetriever(
+                instance.embeddings, index_type=index_type, normalised=True
+            )
         instance.cache_dir = cache_dir
         if instance.cache_dir:
             os.makedirs(instance.cache_dir, exist_ok=True)
         return instance
 
-    def _cache_path_for_doc(self, doc_id: str) -> Optional[str]:
+    @property
+    def embeddings(self) -> np.ndarray:
+        """The (N, D) float32 embedding of every document chunk.
+
+        Rows are L2 normalised when documents are ingested, so inner
+        products between them are cosine similarities.
+
+        This is a view of a buffer that grows geometrically as documents
+        are added; it may be a read-only memory map after :meth:`load`,
+        which is copied on the first :meth:`add_documents`.
+        """
+        return self._emb_buf[:self._emb_size]
+
+    @embeddings.setter
+    def embeddings(self, value: np.ndarray) -> None:
+        self._emb_buf = value
+        self._emb_size = len(value)
+
+    def _index_tags(self, documents: Sequence[Document], *, offset: int = 0) -> None:
+        """Record the lowercased tags of ``documents`` for tag filtering.
+
+        ``offset`` is the position of the first of ``documents`` in
+        ``self.documents``; an offset of 0 starts a fresh index.
+        """
+        if offset == 0:
+            self._tag_to_docids: Dict[str, List[int]] = {}
+        for idx, doc in enumerate(documents, start=offset):
+            for tag in {t.lower() for t in doc.metadata.get('tags') or ()}:
+                self._tag_to_docids.setdefault(tag, []).append(idx)
+
+    def _embedding_store(self) -> Optional[EmbeddingStore]:
+        """Return the content addressed embedding cache in ``cache_dir``."""
         if not self.cache_dir:
             return None
-        safe_name = hashlib.sha256(doc_id.encode("utf-8")).hexdigest()
-        return os.path.join(self.cache_dir, f"{safe_name}.json")
+        path = os.path.join(self.cache_dir, _EMBEDDING_STORE_FILE)
+        store = getattr(self, "_store", None)
+        if store is None or store.path != path:
+            store = EmbeddingStore(path, dtype=_vector_dtype())
+            self._store = store
+        return store
 
-    def _load_cached_embeddings(self, doc_id: str) -> Optional[Dict[str, List[float]]]:
-        cache_path = self._cache_path_for_doc(doc_id)
-        if not cache_path or not os.path.exists(cache_path):
-            return None
-        try:
-            with open(cache_path, "r", encoding="utf-8") as fh:
-                payload = json.load(fh)
-        except Exception:
-            logger.warning("Failed to load cached embeddings for %s; recomputing.", doc_id)
-            return None
-        if payload.get("doc_id") != doc_id:
-            return None
-        chunk_ids = payload.get("chunk_ids", [])
-        vectors = payload.get("embeddings", [])
-        if len(chunk_ids) != len(vectors):
-            return None
-        cache: Dict[str, List[float]] = {}
-        for chunk_id, vector in zip(chunk_ids, vectors):
-            cache[chunk_id] = vector
-        return cache
+    @staticmethod
+    def _reuse_near_duplicates(
+        store: EmbeddingStore,
+        model: str,
+        missing: Dict[str, str],
+        known: Dict[str, np.ndarray],
+    ) -> Dict[str, np.ndarray]:
+        """Take vectors for nearly unchanged chunks from ``store``.
 
-    def _save_cached_embeddings(
-        self,
-        doc_id: str,
-        chunk_ids: Sequence[str],
-        embeddings: Sequence[Sequence[float]],
-    ) -> None:
-        cache_path = self._cache_path_for_doc(doc_id)
-        if not cache_path:
-            return
-        payload = {
-            "doc_id": doc_id,
-            "chunk_ids": list(chunk_ids),
-            "embeddings": [list(vec) for vec in embeddings],
-            "model": getattr(self.embedder, "model_name", ""),
-        }
-        try:
-            with open(cache_path, "w", encoding="utf-8") as fh:
-                json.dump(payload, fh)
-        except Exception as exc:
-            logger.warning("Failed to write embedding cache for %s: %s", doc_id, exc)
+        Chunks in ``missing`` whose text is a near duplicate of a stored
+        chunk (say, after a typo fix) get that chunk's vector in
+        ``known`` and are removed from ``missing``.  Returns the MinHash
+        signatures of the chunks that remain, so they can be matched in
+        later runs once embedded.
+        """
+        signatures = {key: minhash_signature(text) for key, text in missing.items()}
+        if any(signature is None for signature in signatures.values()):
+            logger.warning("datasketch is not installed; RAG_REUSE_NEAR_DUPLICATES is ignored.")
+            return {}
+        matches = store.near_duplicates(model, signatures)
+        reused = store.get_many(model, set(matches.values()))
+        for key, match in matches.items():
+            if match in reused:
+                known[key] = reused[match]
+                del missing[key]
+        return {key: signatures[key] for key in missing}
 
     def _embeddings_from_documents(self, documents: Sequence[Document]) -> np.ndarray:
         if not documents:
             return np.zeros((0, 0), dtype='float32')
-        embeddings_lookup: Dict[str, Sequence[float]] = {}
-        docs_by_id: Dict[str, List[Document]] = {}
         for doc in documents:
-            doc_id = doc.metadata.get('doc_id')
-            chunk_id = doc.metadata.get('chunk_id')
-            if not doc_id or not chunk_id:
+            if not doc.metadata.get('doc_id') or not doc.metadata.get('chunk_id'):
                 raise ValueError("Each document must contain 'doc_id' and 'chunk_id' in metadata.")
-            docs_by_id.setdefault(doc_id, []).append(doc)
-        for doc_id, doc_group in docs_by_id.items():
-            cached_vectors = self._load_cached_embeddings(doc_id) if self.cache_dir else None
-            vector_map: Dict[str, Sequence[float]] = dict(cached_vectors or {})
-            missing_docs: List[Document] = []
-            for doc in doc_group:
-                chunk_id = doc.metadata['chunk_id']
-                if chunk_id in vector_map:
-                    embeddings_lookup[chunk_id] = vector_map[chunk_id]
-                else:
-                    missing_docs.append(doc)
-            if missing_docs:
-                texts = [doc.content for doc in missing_docs]
-                new_vectors = self.embedder.embed_texts(texts)
-                for doc, vec in zip(missing_docs, new_vectors):
-                    chunk_id = doc.metadata['chunk_id']
-                    embeddings_lookup[chunk_id] = vec
-                    vector_map[chunk_id] = vec
-                if self.cache_dir:
-                    chunk_ids = [doc.metadata['chunk_id'] for doc in doc_group]
-                    ordered_vecs = [vector_map[cid] for cid in chunk_ids]
-                    self._save_cached_embeddings(doc_id, chunk_ids, ordered_vecs)
-            else:
-                for doc in doc_group:
-                    chunk_id = doc.metadata['chunk_id']
-                    embeddings_lookup[chunk_id] = vector_map[chunk_id]
-        ordered_vectors: List[Sequence[float]] = []
-        for doc in documents:
-            chunk_id = doc.metadata['chunk_id']
-            vector = embeddings_lookup.get(chunk_id)
-            if vector is None:
-                raise RuntimeError(f"Missing embedding for chunk {chunk_id}")
-            ordered_vectors.append(vector)
-        if not ordered_vectors:
-            return np.zeros((0, 0), dtype='float32')
-        return np.array(ordered_vectors, dtype='float32')
+        # Vectors are cached by the hash of the chunk text, so unchanged
+        # chunks and identical chunks in different files share one entry
+        hashes = [doc.metadata.get('content_hash') or content_hash(doc.content) for doc in documents]
+        # A TF‑IDF fallback must be fitted on the whole corpus before its
+        # signature identifies the vocabulary the cached vectors use
+        self.embedder.ensure_fitted([doc.content for doc in documents])
+        model = self.embedder.signature
+        store = self._embedding_store()
+        known = store.get_many(model, hashes) if store is not None else {}
+        # Embed each missing text once, in a single batched call
+        missing = {key: doc.content for doc, key in zip(documents, hashes) if key not in known}
+        signatures: Dict[str, np.ndarray] = {}
+        if missing and store is not None and env_flag("RAG_REUSE_NEAR_DUPLICATES"):
+            signatures = self._reuse_near_duplicates(store, model, missing, known)
+        if missing:
+            vectors = _dense_float32(self.embedder.embed_batch(list(missing.values())))
+            if self.embedder.signature != model:
+                # The embedder fell back to TF‑IDF part way; vectors from
+                # the two spaces cannot be mixed, so start again in the
+                # new one
+                self.embedder.fit([doc.content for doc in documents])
+                return self._embeddings_from_documents(documents)
+            known.update(zip(missing, vectors))
+            if store is not None:
+                store.put_many(model, list(missing), vectors)
+        if signatures:
+            store.put_signatures(model, {key: signatures[key] for key in missing})
+        dim = len(known[hashes[0]])
+        embeddings = np.empty((len(documents), dim), dtype='float32')
+        for pos, key in enumerate(hashes):
+            embeddings[pos] = known[key]
+        # Normalise once on ingest; every consumer works with unit rows
+        return _l2_normalise_inplace(embeddings)
 
     def add_documents(self, new_docs: List[Document]) -> None:
         """Add new document chunks to the index.
@@ -468,17 +1035,31 @@ class HybridRetriever:
         if new_embeddings.size == 0:
             return
         # Extend lists
+        self._index_tags(new_docs, offset=len(self.documents))
         self.documents.extend(new_docs)
         # Append embeddings
-        if self.embeddings.size == 0:
-            self.embeddings = new_embeddings
-        else:
-            self.embeddings = np.vstack([self.embeddings, new_embeddings])
+        self._emb_buf = _append_rows(self._emb_buf, self._emb_size, new_embeddings)
+        self._emb_size += len(new_embeddings)
         # Update lexical and vector retrievers
         self.lexical_retriever.add_documents(new_docs)
-        self.vector_retriever.add_embeddings(new_embeddings)
+        self.vector_retriever.add_embeddings(new_embeddings, normalised=True)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Return the dense embedding of ``query`` used for vector search."""
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Embed several queries in one call, one dense row per query."""
+        return _dense_float32(self.embedder.embed_texts(list(queries)))
 
-    def retrieve(self, query: str, top_k: int = 10, *, tags: Optional[Sequence[str]] = None) -> List[Tuple[Document, float]]:
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 10,
+        *,
+        tags: Optional[Sequence[str]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Tuple[Document, float]]:
         """Retrieve documents relevant to the query.
 
         This method performs both lexical and vector retrieval, fuses
@@ -499,6 +1080,9 @@ class HybridRetriever:
         tags : sequence of str, optional
             If provided, restrict retrieval to documents whose
             metadata contains at least one of these tags.
+        query_embedding : numpy.ndarray, optional
+            The embedding of ``query`` as returned by
+            :meth:`embed_query`, for callers that already computed it.
 
         Returns
         -------
@@ -513,45 +1097,159 @@ class HybridRetriever:
         k_each = max(top_k * 2, 10)
         lex_indices = self.lexical_retriever.retrieve(query, top_k=k_each)
         # embed query
-        q_embedding = self.embedder.embed_texts([query])[0]
-        vec_indices = self.vector_retriever.query(np.array(q_embedding), top_k=k_each)
-        # Optionally filter by tags
-        def filter_indices(indices: List[int]) -> List[int]:
-            if not tags:
-                return indices
-            allowed = []
-            tagset = set(t.lower() for t in tags)
-            for idx in indices:
-                doc_tags = self.documents[idx].metadata.get('tags')
-                if doc_tags:
-                    # case insensitive matching
-                    if any(t.lower() in tagset for t in doc_tags):
-                        allowed.append(idx)
-            return allowed
-        lex_indices = filter_indices(lex_indices)
-        vec_indices = filter_indices(vec_indices)
-        # Convert indices to document IDs for fusion
-        lex_ids = [str(idx) for idx in lex_indices]
-        vec_ids = [str(idx) for idx in vec_indices]
-        # Fuse with RRF
-        fused = reciprocal_rank_fusion([lex_ids, vec_ids])
-        # Keep only top_k results and map back to documents
-        results: List[Tuple[Document, float]] = []
-        count = 0
-        for doc_id_str, score in fused:
-            idx = int(doc_id_str)
-            results.append((self.documents[idx], score))
-            count += 1
-            if count >= top_k:
-                break
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        vec_indices = self.vector_retriever.query(query_embedding, top_k=k_each)
+        return self._fuse(lex_indices, vec_indices, top_k, tags)
+
+    def retrieve_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        *,
+        tags: Optional[Sequence[str]] = None,
+        query_embeddings: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Retrieve documents for several queries at once.
+
+        Equivalent to calling :meth:`retrieve` for each query, but all
+        queries are embedded in one call and searched with a single
+        batched vector search, which is considerably faster for
+        evaluation runs.  ``query_embeddings`` may supply the rows from
+        :meth:`embed_queries` when they are already known.
+
+        Returns
+        -------
+        list of list of (Document, float)
+            One result list per query, in the order of ``queries``.
+        """
+        results: List[List[Tuple[Document, float]]] = [[] for _ in queries]
+        live = [i for i, query in enumerate(queries) if query.strip()]
+        if not live:
+            return results
+        k_each = max(top_k * 2, 10)
+        live_queries = [queries[i] for i in live]
+        if query_embeddings is None:
+            q_embeddings = self.embed_queries(live_queries)
+        else:
+            q_embeddings = np.asarray(query_embeddings, dtype='float32')[live]
+        vec_batches = self.vector_retriever.query_batch(q_embeddings, top_k=k_each)
+        for i, query, vec_indices in zip(live, live_queries, vec_batches):
+            lex_indices = self.lexical_retriever.retrieve(query, top_k=k_each)
+            results[i] = self._fuse(lex_indices, vec_indices, top_k, tags)
         return results
 
+    def _fuse(
+        self,
+        lex_indices: List[int],
+        vec_indices: List[int],
+        top_k: int,
+        tags: Optional[Sequence[str]],
+    ) -> List[Tuple[Document, float]]:
+        """Filter both candidate lists by ``tags`` and fuse them with RRF."""
+        # Optionally filter by tags (case insensitive); a document is
+        # allowed if it carries at least one of them
+        if tags:
+            allowed = set()
+            for tag in {t.lower() for t in tags}:
+                allowed.update(self._tag_to_docids.get(tag, ()))
+            lex_indices = [idx for idx in lex_indices if idx in allowed]
+            vec_indices = [idx for idx in vec_indices if idx in allowed]
+        # Fuse with RRF, using the document indices as IDs
+        if len(lex_indices) + len(vec_indices) >= _ARRAY_RRF_MIN_CANDIDATES:
+            ids, scores = reciprocal_rank_fusion_array([lex_indices, vec_indices], top_k=top_k)
+            fused = zip(ids.tolist(), scores.tolist())
+        else:
+            fused = reciprocal_rank_fusion([lex_indices, vec_indices], top_k=top_k)
+        # Map the top_k results back to documents
+        return [(self.documents[idx], score) for idx, score in fused]
+
     def save(self, directory: str) -> None:
-        """Persist the current documents and embeddings to ``directory``."""
+        """Persist the current documents and embeddings to ``directory``.
+
+        Alongside ``documents.json`` and ``embeddings.npy`` this writes
+        the FAISS index (when one is in use) and a ``manifest.json``
+        recording what was saved.  Any segments left by
+        :meth:`append_to_disk` are folded into the base files.
+        """
         os.makedirs(directory, exist_ok=True)
+        previous = _read_manifest(directory)
         docs_path = os.path.join(directory, "documents.json")
         embeddings_path = os.path.join(directory, "embeddings.npy")
         payload = {"documents": _documents_to_serialisable(self.documents)}
-        with open(docs_path, "w", encoding="utf-8") as fh:
-            json.dump(payload, fh)
-        np.save(embeddings_path, self.embeddings)
+        _json_dump(payload, docs_path)
+        # Write to a temporary file and rename it into place: the current
+        # matrix may be a memory map of the file being replaced
+        tmp_path = embeddings_path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            np.save(fh, self.embeddings)
+        os.replace(tmp_path, embeddings_path)
+        self.embedder.save(os.path.join(directory, "embedder.pkl"))
+        self._write_faiss_index(directory)
+        _write_manifest(directory, self._manifest([]))
+        for segment in (previous or {}).get("segments", []):
+            for name in segment.values():
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def append_to_disk(self, directory: str, new_docs: List[Document]) -> None:
+        """Add ``new_docs`` and persist only the change to ``directory``.
+
+        The new chunks and their embeddings are written as a numbered
+        segment listed in ``manifest.json`` instead of rewriting
+        ``documents.json`` and ``embeddings.npy``; :meth:`load` reads the
+        segments back and :meth:`save` folds them in.  The FAISS index is
+        re-serialised, as FAISS has no append-only on-disk format.  If
+        ``directory`` does not hold a save of this retriever's current
+        state, a full :meth:`save` is performed instead.
+        """
+        manifest = _read_manifest(directory)
+        in_sync = manifest is not None and manifest.get("num_documents") == len(self.documents)
+        start = len(self.documents)
+        self.add_documents(new_docs)
+        if not in_sync:
+            self.save(directory)
+            return
+        if len(self.documents) == start:
+            return
+        segments = list(manifest.get("segments", []))
+        segment = {
+            "documents": f"documents-{start:08d}.json",
+            "embeddings": f"embeddings-{start:08d}.npy",
+        }
+        _json_dump(
+            {"documents": _documents_to_serialisable(self.documents[start:])},
+            os.path.join(directory, segment["documents"]),
+        )
+        np.save(os.path.join(directory, segment["embeddings"]), self.embeddings[start:])
+        segments.append(segment)
+        self._write_faiss_index(directory)
+        _write_manifest(directory, self._manifest(segments))
+
+    def _write_faiss_index(self, directory: str) -> None:
+        path = os.path.join(directory, _FAISS_INDEX_FILE)
+        if not self.vector_retriever.use_faiss:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        index = self.vector_retriever.index
+        if hasattr(faiss, "index_gpu_to_cpu") and _num_gpus() > 0:
+            try:
+                index = faiss.index_gpu_to_cpu(index)
+            except Exception:
+                # already a CPU index
+                pass
+        faiss.write_index(index, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    def _manifest(self, segments: List[Dict[str, str]]) -> Dict[str, object]:
+        return {
+            "num_documents": len(self.documents),
+            "dim": int(self.embeddings.shape[1]) if self.embeddings.ndim == 2 else 0,
+            "model": self.embedder.signature,
+            "faiss_index": self.vector_retriever.use_faiss,
+            "normalised": True,
+            "segments": segments,
+        }
@@ -17,15 +17,21 @@ and build your own orchestration layer.
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import io
+import json
 import logging
 import os
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np  # type: ignore
 
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import AsyncOpenAI, OpenAI  # type: ignore
     _OPENAI_AVAILABLE = True
 except ImportError:  # pragma: no cover
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = OpenAI = None  # type: ignore
     _OPENAI_AVAILABLE = False
 
 _openai_client: Optional[OpenAI] = None
@@ -35,20 +41,25 @@ from .env import load_env
 load_env()
 
 
-def _get_openai_client() -> OpenAI:
-    """Lazily create and cache an OpenAI client instance."""
+def _openai_credentials() -> Tuple[str, str]:
+    """Return the API key and base URL for the chat completion API."""
     if not _OPENAI_AVAILABLE or OpenAI is None:
         raise RuntimeError(
             "The openai package is not installed; cannot generate answers."
         )
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "OpenAI API key not found; set OPENAI_API_KEY to enable answer generation."
+        )
+    return api_key, os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1/")
+
+
+def _get_openai_client() -> OpenAI:
+    """Lazily create and cache an OpenAI client instance."""
     global _openai_client
     if _openai_client is None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError(
-                "OpenAI API key not found; set OPENAI_API_KEY to enable answer generation."
-            )
-        base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1/")
+        api_key, base_url = _openai_credentials()
         try:
             _openai_client = OpenAI(api_key=api_key, base_url=base_url)
         except Exception as exc:  # pragma: no cover
@@ -57,12 +68,143 @@ def _get_openai_client() -> OpenAI:
             ) from exc
     return _openai_client
 
-from .embedding import EmbeddingModel
+from .cache import AnswerCache, SemanticCache
+from .embedding import EmbeddingModel, corpus_fingerprint
 from .hybrid_retrieval import HybridRetriever
-from .utils import Document, load_documents_from_dir
+from .throttle import RateLimiter, call_with_retry, token_counter
+from .utils import Document, content_hash, load_documents_from_dir, load_single_document
 
 logger = logging.getLogger(__name__)
 
+# Flattens each passage onto one line of the prompt.
+_NEWLINES_TO_SPACES = str.maketrans({"\n": " ", "\r": " "})
+
+_NO_CONTEXT_ANSWER = "I'm sorry, I couldn't find any relevant information to answer your question."
+
+_SYSTEM_PROMPT = (
+    "You are a helpful assistant for a technical Q&A service. "
+    # "Answer the user's question using only the provided context. "
+    "I will first give you some context to reference, then I will ask you a question. "
+    "If the answer is not contained in the context, respond with your own knowledge."
+)
+
+# Opens the user message, ahead of the retrieved passages.
+_CONTEXT_PREFIX = "Some content for you to reference:\n"
+
+# Defaults for answer_questions_batch: how many chat requests may be in
+# flight at once and the rate limits they are throttled to.
+_MAX_INFLIGHT_ANSWERS = 20
+_CHAT_REQUESTS_PER_MINUTE = 500
+_CHAT_TOKENS_PER_MINUTE = 150_000
+
+# Number of query embeddings each client keeps in memory.
+_QUERY_CACHE_SIZE = 4096
+
+
+def _build_messages(query: str, context_docs: List[Tuple[Document, float]]) -> List[Dict[str, str]]:
+    """Build the chat messages asking ``query`` against ``context_docs``."""
+    # Write the source name and flattened snippet of each passage
+    # straight into one buffer
+    buf = io.StringIO()
+    for position, (doc, _) in enumerate(context_docs):
+        if position:
+            buf.write("\n\n")
+        buf.write("Source: ")
+        buf.write(str(doc.metadata.get('source')))
+        buf.write("\n")
+        buf.write(doc.content.translate(_NEWLINES_TO_SPACES).strip())
+    context_str = buf.getvalue()
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": f"{_CONTEXT_PREFIX}{context_str}\n\nQuestion: {query}\nAnswer:"},
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _prompt_prefix_tokens(model: str) -> int:
+    """Return the tokens ``model`` sees in the fixed part of every prompt."""
+    count_tokens = token_counter(model)
+    return count_tokens(_SYSTEM_PROMPT) + count_tokens(_CONTEXT_PREFIX)
+
+
+def _prompt_tokens(model: str, messages: List[Dict[str, str]]) -> int:
+    """Count the prompt tokens of ``messages`` from :func:`_build_messages`.
+
+    The system prompt and the opening of the user message are the same
+    for every question, so only the passages and question are counted.
+    """
+    content = messages[-1]["content"]
+    return _prompt_prefix_tokens(model) + token_counter(model)(content[len(_CONTEXT_PREFIX):])
+
+
+def _corpus_fingerprint(documents: Sequence[Document]) -> str:
+    """Identify the indexed corpus by the source and text of every chunk.
+
+    Order does not matter, so reloading an unchanged directory gives
+    the same fingerprint while any added, removed or edited file
+    changes it.
+    """
+    return corpus_fingerprint(
+        sorted(
+            f"{doc.metadata.get('source')}\0{doc.metadata.get('content_hash') or content_hash(doc.content)}"
+            for doc in documents
+        )
+    )
+
+
+def _answer_from_response(response: object) -> str:
+    """Extract the answer text from a chat completion response."""
+    choice = response.choices[0]
+    if getattr(choice, "finish_reason", None) == "length":
+        logger.warning(
+            "OpenAI completion stopped because of max_tokens limit; consider increasing max_tokens."
+        )
+    message = choice.message.content
+    return message.strip() if message else ""
+
+
+async def _complete_all(
+    conversations: List[List[Dict[str, str]]],
+    *,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    max_inflight: int,
+    requests_per_minute: float,
+    tokens_per_minute: float,
+) -> List[Union[str, BaseException]]:
+    """Run chat completions for ``conversations`` concurrently.
+
+    At most ``max_inflight`` requests are outstanding at once.  Each
+    request reserves its prompt tokens plus ``max_tokens`` from a
+    :class:`~rag_system.throttle.RateLimiter` before it is sent, and
+    rate limited requests are retried with jittered back-off.  A
+    request that still fails yields its exception in place of the
+    answer, so it does not take the rest of the batch down with it.
+    """
+    api_key, base_url = _openai_credentials()
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(max_inflight)
+    async with AsyncOpenAI(api_key=api_key, base_url=base_url) as client:
+
+        async def complete(messages: List[Dict[str, str]]) -> str:
+            tokens = _prompt_tokens(model, messages) + max_tokens
+            async with semaphore:
+                await limiter.acquire(tokens)
+                response = await call_with_retry(
+                    lambda: client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    )
+                )
+            return _answer_from_response(response)
+
+        return await asyncio.gather(
+            *(complete(messages) for messages in conversations), return_exceptions=True
+        )
+
 
 class RAGClient:
     """High level interface for a retrieval‑augmented generation system.
@@ -71,17 +213,52 @@ class RAGClient:
     and exposes simple methods to initialise the index, add new
     documents and query the system.  It also provides an optional
     method to generate answers using OpenAI's chat completion API.
+
+    Parameters
+    ----------
+    index : HybridRetriever
+        The retriever to query.
+    answer_cache : AnswerCache, optional
+        Persistent store of generated answers.  When given, repeated
+        questions are answered without retrieval or an API call.
+    semantic_cache : SemanticCache, optional
+        Like ``answer_cache`` but also matches paraphrased questions
+        by comparing query embeddings.
     """
 
-    def __init__(self, index: HybridRetriever) -> None:
+    def __init__(
+        self,
+        index: HybridRetriever,
+        *,
+        answer_cache: Optional[AnswerCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+    ) -> None:
         self.index = index
+        self.answer_cache = answer_cache
+        self.semantic_cache = semantic_cache
+        # Per client rather than per class so the cache dies with the
+        # index whose embedder produced the vectors.
+        self._embed_query = functools.lru_cache(maxsize=_QUERY_CACHE_SIZE)(
+            self._compute_query_embedding
+        )
+
+    def _compute_query_embedding(self, query: str) -> np.ndarray:
+        """Embed ``query``; the result is read-only as it is shared via the cache."""
+        embedding = self.index.embed_query(query)
+        embedding.setflags(write=False)
+        return embedding
+
+    def clear_query_cache(self) -> None:
+        """Forget the cached query embeddings."""
+        self._embed_query.cache_clear()
 
     @classmethod
     def from_directory(
         cls,
         data_dir: str,
         *,
-        embedder: Optional[EmbeddingModel] = None
+        embedder: Optional[EmbeddingModel] = None,
+        cache_answers: bool = True,
     ) -> "RAGClient":
         """Initialise the retrieval system from a directory of text files.
 
@@ -95,6 +272,12 @@ class RAGClient:
             A preconfigured embedding model.  If omitted a default
             :class:`~rag_system.embedding.EmbeddingModel` instance is
             created using the ``OPENAI_API_KEY`` environment variable.
+        cache_answers : bool
+            Keep generated answers in ``.answer_cache`` under
+            ``data_dir`` so repeated questions are served from disk
+            for as long as the documents in ``data_dir`` are unchanged,
+            and index their query embeddings in ``.embeddings`` so
+            paraphrases of earlier questions are too.
 
         Returns
         -------
@@ -105,8 +288,30 @@ class RAGClient:
             embedder = EmbeddingModel()
         documents = load_documents_from_dir(data_dir)
         cache_dir = os.path.join(data_dir, ".embeddings")
+        if not embedder.use_openai and documents:
+            # Fit TF‑IDF on the whole corpus so documents and queries
+            # share one vocabulary, reusing the previous fit when the
+            # corpus has not changed since the last run.
+            texts = [doc.content for doc in documents]
+            state_path = os.path.join(cache_dir, "tfidf.pkl")
+            if not embedder.load(state_path, fingerprint=corpus_fingerprint(texts)):
+                embedder.fit(texts)
+                os.makedirs(cache_dir, exist_ok=True)
+                embedder.save(state_path)
         index = HybridRetriever(documents, embedder, cache_dir=cache_dir)
-        return cls(index)
+        answer_cache = semantic_cache = None
+        if cache_answers:
+            corpus = _corpus_fingerprint(documents)
+            answer_cache = AnswerCache(
+                os.path.join(data_dir, ".answer_cache", "answers.sqlite"),
+                corpus=corpus,
+            )
+            semantic_cache = SemanticCache(
+                os.path.join(cache_dir, "semantic_cache.sqlite"),
+                signature=embedder.signature,
+                corpus=corpus,
+            )
+        return cls(index, answer_cache=answer_cache, semantic_cache=semantic_cache)
 
     def add_files(self, file_paths: Sequence[str]) -> None:
         """Add one or more text files to the RAG system.
@@ -124,18 +329,17 @@ class RAGClient:
         new_docs: List[Document] = []
         for file_path in file_paths:
             try:
-                docs = load_documents_from_dir(os.path.dirname(file_path), parse_tags=True)
-                # filter docs whose doc_id matches the exact file
-                # Because load_documents_from_dir reads all .txt files in the folder,
-                # we select those corresponding to the requested path.
-                norm = os.path.abspath(file_path)
-                for doc in docs:
-                    if doc.metadata['doc_id'] == norm:
-                        new_docs.append(doc)
+                new_docs.extend(load_single_document(file_path, parse_tags=True))
             except Exception as e:
                 logger.warning("Failed to load %s: %s", file_path, e)
         if new_docs:
             self.index.add_documents(new_docs)
+            corpus = _corpus_fingerprint(self.index.documents)
+            if self.answer_cache is not None:
+                self.answer_cache.corpus = corpus
+            if self.semantic_cache is not None:
+                self.semantic_cache.set_corpus(corpus)
+            self.clear_query_cache()
 
     def save_index(self, directory: str) -> None:
         """Persist the underlying index to ``directory``."""
@@ -164,8 +368,17 @@ class RAGClient:
         -------
         list of (Document, float)
             Document chunks and their scores.
+
+        Notes
+        -----
+        Query embeddings are cached per client, so repeating a query
+        does not embed it again.
         """
-        return self.index.retrieve(query, top_k=top_k, tags=tags)
+        if not query.strip():
+            return []
+        return self.index.retrieve(
+            query, top_k=top_k, tags=tags, query_embedding=self._embed_query(query)
+        )
 
     def generate_answer(
         self,
@@ -184,7 +397,9 @@ class RAGClient:
         OpenAI's chat completion API.  The prompt instructs the model
         to answer the question using only the provided context.  If
         the OpenAI client library is not installed or no API key is
-        configured, a RuntimeError is raised.
+        configured, a RuntimeError is raised.  Answers found in the
+        client's answer caches are returned without either step.  This
+        collects the output of :meth:`generate_answer_stream`.
 
         Parameters
         ----------
@@ -209,46 +424,236 @@ class RAGClient:
         str
             The generated answer.
         """
+        return "".join(
+            self.generate_answer_stream(
+                query,
+                top_k=top_k,
+                tags=tags,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        ).strip()
+
+    def generate_answer_stream(
+        self,
+        query: str,
+        *,
+        top_k: int = 5,
+        tags: Optional[Sequence[str]] = None,
+        model: str = "gpt-4o", # gpt-4o-mini
+        temperature: float = 0.2,
+        max_tokens: int = 1024,
+    ) -> Iterator[str]:
+        """Generate an answer like :meth:`generate_answer`, piece by piece.
+
+        The completion is streamed, so the first words can be shown as
+        soon as the model produces them instead of after the whole
+        answer has been decoded.  Cached answers arrive as one piece.
+
+        Parameters
+        ----------
+        query : str
+            The user's question.
+        top_k : int
+            Number of context passages to use.  A larger value can
+            provide more background at the cost of potential noise.
+        tags : sequence of str, optional
+            Restrict retrieval to documents containing specific tags.
+        model : str
+            Which OpenAI chat model to use.  Defaults to
+            ``gpt-4o``.
+        temperature : float
+            Sampling temperature for the language model.
+        max_tokens : int
+            Maximum number of tokens to generate.  Increase this if answers
+            are truncated.
+
+        Yields
+        ------
+        str
+            Consecutive pieces of the answer.  Joined and stripped
+            they form the answer :meth:`generate_answer` returns.
+        """
+        cache_key = None
+        if self.answer_cache is not None:
+            cache_key = self.answer_cache.key(
+                query,
+                model=model,
+                top_k=top_k,
+                tags=tags,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            cached = self.answer_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        query_embedding: Optional[np.ndarray] = None
+        scope = ""
+        if self.semantic_cache is not None and query.strip():
+            query_embedding = self._embed_query(query)
+            scope = json.dumps([model, top_k, sorted(tags or []), temperature, max_tokens])
+            cached = self.semantic_cache.lookup(query_embedding, scope)
+            if cached is not None:
+                yield cached
+                return
         client = _get_openai_client()
         context_docs = self.retrieve(query, top_k=top_k, tags=tags)
         if not context_docs:
-            return "I'm sorry, I couldn't find any relevant information to answer your question."
-        # Build a prompt with sources and contents
-        sources = []
-        for doc, score in context_docs:
-            # include source name and snippet
-            source_line = f"Source: {doc.metadata.get('source')}"
-            content_line = doc.content.replace('\n', ' ').strip()
-            sources.append(f"{source_line}\n{content_line}")
-        context_str = "\n\n".join(sources)
-        system_prompt = (
-            "You are a helpful assistant for a technical Q&A service. "
-            # "Answer the user's question using only the provided context. "
-            "I will first give you some context to reference, then I will ask you a question. "
-            "If the answer is not contained in the context, respond with your own knowledge."
-        )
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Some content for you to reference:\n{context_str}\n\nQuestion: {query}\nAnswer:"},
-        ]
+            yield _NO_CONTEXT_ANSWER
+            return
+        messages = _build_messages(query, context_docs)
         # Call the OpenAI chat completion API
         try:
-            response = client.chat.completions.create(
+            stream = client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
+                stream=True,
             )
         except Exception as exc:  # pragma: no cover
             logger.error("OpenAI chat completion failed: %s", exc)
             raise
-        choice = response.choices[0]
-        if getattr(choice, "finish_reason", None) == "length":
+        parts: List[str] = []
+        finish_reason = None
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+            text = getattr(choice.delta, "content", None)
+            if text and not parts:
+                # Match the stripped answer of generate_answer
+                text = text.lstrip()
+            if text:
+                parts.append(text)
+                yield text
+        if finish_reason == "length":
             logger.warning(
                 "OpenAI completion stopped because of max_tokens limit; consider increasing max_tokens."
             )
-        message = choice.message.content
-        return message.strip() if message else ""
+        answer = "".join(parts).strip()
+        if answer:
+            if cache_key is not None:
+                self.answer_cache.set(cache_key, answer)
+            if query_embedding is not None:
+                self.semantic_cache.add(query_embedding, scope, answer)
+
+    def answer_questions_batch(
+        self,
+        queries: Sequence[str],
+        *,
+        top_k: int = 5,
+        tags: Optional[Sequence[str]] = None,
+        model: str = "gpt-4o",
+        temperature: float = 0.2,
+        max_tokens: int = 1024,
+        max_inflight: int = _MAX_INFLIGHT_ANSWERS,
+        requests_per_minute: float = _CHAT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = _CHAT_TOKENS_PER_MINUTE,
+    ) -> List[Union[str, Exception]]:
+        """Answer many questions with concurrent chat completion calls.
+
+        Gives the same answers as calling :meth:`generate_answer` for
+        each query, but the uncached queries are retrieved in one batch
+        and their completions are sent concurrently, throttled to the
+        given rate limits.  Must not be called from a running event
+        loop.
+
+        Parameters
+        ----------
+        queries : sequence of str
+            The questions to answer.
+        top_k, tags, model, temperature, max_tokens
+            As for :meth:`generate_answer`.
+        max_inflight : int
+            Maximum number of chat requests outstanding at once.
+        requests_per_minute, tokens_per_minute : float
+            Rate limits of the chat model for this account.
+
+        Returns
+        -------
+        list of str or Exception
+            One answer per query, in the order of ``queries``.  A query
+            whose completion failed gets the exception raised for it
+            instead; the other answers are still returned and cached.
+        """
+        answers: List[Optional[Union[str, Exception]]] = [None] * len(queries)
+        keys: List[Optional[str]] = [None] * len(queries)
+        # Blank questions retrieve nothing, as in generate_answer_stream;
+        # they must not reach the embedder either
+        for i, query in enumerate(queries):
+            if not query.strip():
+                answers[i] = _NO_CONTEXT_ANSWER
+        if self.answer_cache is not None:
+            for i, query in enumerate(queries):
+                if answers[i] is not None:
+                    continue
+                keys[i] = self.answer_cache.key(
+                    query,
+                    model=model,
+                    top_k=top_k,
+                    tags=tags,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                answers[i] = self.answer_cache.get(keys[i])
+        pending = [i for i, answer in enumerate(answers) if answer is None]
+        query_embeddings: Optional[np.ndarray] = None
+        scope = json.dumps([model, top_k, sorted(tags or []), temperature, max_tokens])
+        if self.semantic_cache is not None and pending:
+            embeddings = self.index.embed_queries([queries[i] for i in pending])
+            misses = []
+            for row, i in enumerate(pending):
+                answers[i] = self.semantic_cache.lookup(embeddings[row], scope)
+                if answers[i] is None:
+                    misses.append(row)
+            pending = [pending[row] for row in misses]
+            query_embeddings = embeddings[misses]
+        if not pending:
+            return answers
+        _openai_credentials()
+        contexts = self.index.retrieve_batch(
+            [queries[i] for i in pending],
+            top_k=top_k,
+            tags=tags,
+            query_embeddings=query_embeddings,
+        )
+        rows: List[int] = []
+        conversations: List[List[Dict[str, str]]] = []
+        for row, (i, context_docs) in enumerate(zip(pending, contexts)):
+            if context_docs:
+                rows.append(row)
+                conversations.append(_build_messages(queries[i], context_docs))
+            else:
+                answers[i] = _NO_CONTEXT_ANSWER
+        completions = asyncio.run(
+            _complete_all(
+                conversations,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                max_inflight=max_inflight,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+            )
+        )
+        for row, answer in zip(rows, completions):
+            i = pending[row]
+            if isinstance(answer, BaseException):
+                if not isinstance(answer, Exception):
+                    raise answer
+                logger.error("Answering %r failed: %s", queries[i], answer)
+            answers[i] = answer
+            if isinstance(answer, Exception) or not answer:
+                continue
+            if keys[i] is not None:
+                self.answer_cache.set(keys[i], answer)
+            if query_embeddings is not None:
+                self.semantic_cache.add(query_embeddings[row], scope, answer)
+        return answers
 
 
 def initialise_rag(data_dir: str) -> RAGClient:
@@ -325,3 +730,27 @@ def answer_question(
         temperature=temperature,
         max_tokens=max_tokens,
     )
+
+
+def answer_questions(
+    client: RAGClient,
+    questions: Sequence[str],
+    *,
+    top_k: int = 5,
+    tags: Optional[Sequence[str]] = None,
+    model: str = "gpt-4o",
+    temperature: float = 0.2,
+    max_tokens: int = 1024
+) -> List[Union[str, Exception]]:
+    """Answer several questions concurrently using retrieved context.
+
+    This is a thin wrapper around :meth:`RAGClient.answer_questions_batch`.
+    """
+    return client.answer_questions_batch(
+        questions,
+        top_k=top_k,
+        tags=tags,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
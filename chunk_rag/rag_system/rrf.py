@@ -13,18 +13,28 @@ This module implements a reference RRF algorithm with sensible
 defaults.  It operates on lists of document identifiers and produces a
 single ranked list of identifiers.  You can pass optional per‑method
 weights to emphasise one retrieval system over another.
+:func:`reciprocal_rank_fusion_array` computes the same fusion with
+NumPy for runs of integer IDs, which pays off for large candidate
+pools.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Sequence, Tuple
+import heapq
+import operator
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np  # type: ignore
+
+DocId = TypeVar("DocId", bound=Hashable)
 
 
 def reciprocal_rank_fusion(
-    runs: Sequence[Sequence[str]],
+    runs: Sequence[Sequence[DocId]],
     k: int = 60,
     weights: Optional[Sequence[float]] = None,
-) -> List[Tuple[str, float]]:
+    top_k: Optional[int] = None,
+) -> List[Tuple[DocId, float]]:
     """Fuse multiple ranked lists using Reciprocal Rank Fusion (RRF).
 
     Parameters
@@ -32,7 +42,8 @@ def reciprocal_rank_fusion(
     runs : sequence of sequences
         Each element of ``runs`` is a ranked list of document IDs
         returned by one retrieval method.  The first element in a
-        list is considered the top document.
+        list is considered the top document.  IDs may be any hashable
+        value (strings, integer indices, ...).
     k : int, optional
         The RRF constant.  Larger values reduce the influence of
         lower ranks.  Defaults to 60 as suggested in the literature.
@@ -40,10 +51,14 @@ def reciprocal_rank_fusion(
         Optional weights to multiply each system's contribution.  Must
         be the same length as ``runs``.  If omitted, all systems are
         weighted equally.
+    top_k : int, optional
+        Return only the ``top_k`` best documents.  They are selected
+        with a partial sort, which is cheaper than ranking the whole
+        candidate pool.
 
     Returns
     -------
-    list of (str, float)
+    list of (id, float)
         A list of tuples containing the document ID and its RRF score,
         sorted in descending order of score.
 
@@ -62,11 +77,73 @@ def reciprocal_rank_fusion(
     if weights is None:
         weights = [1.0 for _ in runs]
     # Aggregate scores
-    scores: Dict[str, float] = {}
+    scores: Dict[DocId, float] = {}
     for run_idx, run in enumerate(runs):
         weight = weights[run_idx]
         for rank, doc_id in enumerate(run):
             # RRF score contribution: weight / (k + rank)
             scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank + 1)
-    # Sort by descending score
-    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
\ No newline at end of file
+    # Sort by descending score; nlargest keeps the same tie order
+    if top_k is not None:
+        return heapq.nlargest(top_k, scores.items(), key=operator.itemgetter(1))
+    return sorted(scores.items(), key=operator.itemgetter(1), reverse=True)
+
+
+def reciprocal_rank_fusion_array(
+    runs: Sequence[Sequence[int]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+    top_k: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fuse ranked lists of integer IDs with RRF using array operations.
+
+    Produces the same ranking and scores as
+    :func:`reciprocal_rank_fusion`, including its tie order (documents
+    with equal scores keep the order in which they first appear), but
+    accumulates the contributions with :func:`numpy.bincount` instead
+    of a dictionary.
+
+    Parameters
+    ----------
+    runs : sequence of sequences of int
+        Ranked lists of integer document IDs, e.g. row indices.
+    k : int, optional
+        The RRF constant.
+    weights : sequence of floats, optional
+        Per-run weights, as for :func:`reciprocal_rank_fusion`.
+    top_k : int, optional
+        Return only the ``top_k`` best documents, found with
+        :func:`numpy.argpartition` before the final sort.
+
+    Returns
+    -------
+    ids : numpy.ndarray
+        The fused document IDs (int64), best first.
+    scores : numpy.ndarray
+        Their RRF scores (float64).
+    """
+    if weights is not None and len(weights) != len(runs):
+        raise ValueError("Length of weights must match number of runs")
+    if weights is None:
+        weights = [1.0 for _ in runs]
+    arrays = [np.asarray(run, dtype=np.int64).ravel() for run in runs]
+    if not arrays or not any(len(run) for run in arrays):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ids = np.concatenate(arrays)
+    contributions = np.concatenate([
+        weight / (k + np.arange(1, len(run) + 1, dtype=np.float64))
+        for run, weight in zip(arrays, weights)
+    ])
+    unique, first_seen, inverse = np.unique(ids, return_index=True, return_inverse=True)
+    scores = np.bincount(inverse.ravel(), weights=contributions, minlength=len(unique))
+    if top_k is not None and top_k < len(unique):
+        if top_k <= 0:
+            return unique[:0], scores[:0]
+        # Keep everything tied with the k-th best score so the tie
+        # order below still decides which of them make the cut
+        kth = -np.partition(-scores, top_k - 1)[top_k - 1]
+        keep = np.flatnonzero(scores >= kth)
+        unique, first_seen, scores = unique[keep], first_seen[keep], scores[keep]
+    # Highest score first; equal scores in order of first appearance
+    order = np.lexsort((first_seen, -scores))[:top_k]
+    return unique[order], scores[order]
@@ -0,0 +1,126 @@
+"""
+throttle.py
+-----------
+
+Helpers for keeping concurrent OpenAI requests within the account's
+rate limits, following the approach of the OpenAI cookbook's parallel
+request processor: every request first takes its share of a requests
+per minute and tokens per minute budget, and requests rejected with
+HTTP 429 anyway are retried after a jittered exponential back-off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MAX_ATTEMPTS = 6
+_BASE_DELAY = 1.0
+
+
+@functools.lru_cache(maxsize=None)
+def token_counter(model_name: str) -> Callable[[str], int]:
+    """Return a function counting the tokens ``model_name`` sees in a text.
+
+    Uses ``tiktoken`` when it is installed and knows the model;
+    otherwise estimates four characters per token, which is close
+    enough for batching and throttling English text.
+    """
+    try:
+        import tiktoken  # type: ignore
+
+        encoding = tiktoken.encoding_for_model(model_name)
+    except (ImportError, KeyError):
+        return lambda text: len(text) // 4 + 1
+    return lambda text: len(encoding.encode_ordinary(text))
+
+
+class RateLimiter:
+    """Token bucket limiting both request and token throughput.
+
+    Both budgets start full and refill continuously at their per
+    minute rate.  :meth:`acquire` waits until one request and the
+    given number of tokens are available.
+
+    Parameters
+    ----------
+    requests_per_minute : float
+        Request budget per minute.
+    tokens_per_minute : float
+        Token budget per minute.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        minutes = (now - self._updated) / 60.0
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + minutes * self.requests_per_minute)
+        self._tokens = min(self.tokens_per_minute, self._tokens + minutes * self.tokens_per_minute)
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request carrying ``tokens`` tokens may be sent."""
+        # A single request larger than the whole budget would never fit;
+        # let it through once the bucket is full instead.
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) / self.requests_per_minute,
+                    (tokens - self._tokens) / self.tokens_per_minute,
+                ) * 60.0
+                await asyncio.sleep(max(wait, 0.001))
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """Return whether ``exc`` is an HTTP 429 response from the API."""
+    return (
+        getattr(exc, "status_code", None) == 429
+        or type(exc).__name__ == "RateLimitError"
+    )
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[T]],
+    *,
+    max_attempts: int = _MAX_ATTEMPTS,
+    base_delay: float = _BASE_DELAY,
+) -> T:
+    """Await ``call()``, retrying rate limited attempts with back-off.
+
+    The n-th retry waits ``base_delay * 2**n`` seconds scaled by a
+    random factor between 0.5 and 1.5, so that requests throttled
+    together do not all retry at the same moment.  Other errors, and
+    the last rate limit error, are raised unchanged.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as exc:
+            attempt += 1
+            if attempt >= max_attempts or not _is_rate_limited(exc):
+                raise
+            delay = base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            logger.warning("OpenAI rate limit hit; retrying in %.1f s.", delay)
+            await asyncio.sleep(delay)
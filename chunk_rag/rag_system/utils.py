@@ -10,10 +10,24 @@ retrieval logic.
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import os
-import pathlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Default chunking: characters per chunk and overlap between chunks.
+_CHUNK_SIZE = 800
+_CHUNK_OVERLAP = 50
+# Upper bound on the threads reading files in load_documents_from_dir.
+_MAX_LOADER_THREADS = 32
+# From this many files on, the loader first asks the kernel to read all
+# of them ahead so the device sees one deep queue of requests.
+_PREFETCH_MIN_FILES = 64
+# Files are read and chunked in blocks of this many characters, so a
+# large file is never held in memory whole.
+_READ_BLOCK = 1 << 20
 
 
 @dataclass
@@ -27,16 +41,24 @@ class Document:
     metadata : dict
         A dictionary of arbitrary metadata associated with the
         document.  This often includes fields like ``source`` (the
-        filename), ``tags`` (list of category labels), and
+        filename), ``tags`` (tuple of category labels), and
         ``doc_id`` (a unique identifier for the parent document).
     """
 
+    # No per-instance __dict__: a corpus can hold millions of chunks
+    __slots__ = ("content", "metadata")
+
     content: str
     metadata: Dict[str, any]
 
 
+def content_hash(text: str) -> str:
+    """Return the SHA-256 hex digest identifying a chunk's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 def split_text(
-    text: str, *, chunk_size: int = 800, overlap: int = 50
+    text: str, *, chunk_size: int = _CHUNK_SIZE, overlap: int = _CHUNK_OVERLAP
 ) -> List[str]:
     """Split text into chunks of roughly ``chunk_size`` tokens.
 
@@ -60,30 +82,187 @@ def split_text(
     -------
     list of str
         The list of text chunks.
+
+    Raises
+    ------
+    ValueError
+        If ``overlap`` is not smaller than ``chunk_size``, in which
+        case the chunks would never advance through the text.
     """
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
     if not text:
         return []
     # For simplicity we treat characters as tokens; for more
     # sophisticated splitting you could integrate a tokenizer or
-    # sentence boundary detector here.
-    chunks = []
-    start = 0
+    # sentence boundary detector here.  Chunks start every
+    # ``chunk_size - overlap`` characters, and the last one is the
+    # first chunk to reach the end of the text.
+    step = chunk_size - overlap
     length = len(text)
-    while start < length:
-        end = min(start + chunk_size, length)
-        chunks.append(text[start:end])
-        # If we've reached the end of the text, break to avoid an
-        # infinite loop when the document length is less than
-        # chunk_size but greater than overlap (end - overlap would not
-        # advance the pointer).
-        if end == length:
+    stop = min(max(length - chunk_size, 0) + step, length)
+    return [text[start:start + chunk_size] for start in range(0, stop, step)]
+
+
+def _prefetch(paths: Iterable[str]) -> None:
+    """Ask the kernel to start reading ``paths`` into the page cache.
+
+    ``posix_fadvise(WILLNEED)`` returns immediately, so hinting every
+    file up front lets the reads overlap on cold storage instead of
+    waiting for each file in turn.  Platforms without the call, and
+    files that cannot be opened, are skipped; the loader reports those
+    when it reads them.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _iter_txt(root: str) -> Iterator[str]:
+    """Yield the path of every ``.txt`` file under ``root``.
+
+    Uses :func:`os.scandir` directly rather than ``Path.rglob``, which
+    builds a path object for every entry.  Files come in the same
+    order as from ``rglob``: each directory's own files first, then its
+    subdirectories depth first.  Symbolic links to directories are not
+    followed and unreadable directories are skipped.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(".txt") and entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+
+
+def _stream_chunks(f: IO[str], head: str) -> Iterator[str]:
+    """Yield the chunks of ``head`` followed by the rest of ``f``.
+
+    The result equals ``split_text((head + f.read()).strip())``.
+
+    The file is read in blocks of ``_READ_BLOCK`` characters.  A chunk
+    is emitted as soon as text beyond its end is known to follow, since
+    only the last chunk depends on where the stripped text ends.
+    """
+    step = _CHUNK_SIZE - _CHUNK_OVERLAP
+    buf = head.lstrip()
+    while True:
+        block = f.read(_READ_BLOCK)
+        if not block:
             break
-        # Move the start pointer forward by chunk_size - overlap
-        start = end - overlap
-        # Ensure start does not go backwards beyond the beginning
-        if start < 0:
-            start = 0
-    return chunks
+        buf = buf + block if buf else block.lstrip()
+        end = len(buf.rstrip())
+        start = 0
+        while start + _CHUNK_SIZE < end:
+            yield buf[start:start + _CHUNK_SIZE]
+            start += step
+        buf = buf[start:]
+    yield from split_text(buf.rstrip(), chunk_size=_CHUNK_SIZE, overlap=_CHUNK_OVERLAP)
+
+
+def _with_fallback(chunks: Iterator[str], text: str) -> Iterator[str]:
+    """Yield ``chunks``, or the chunks of ``text`` if there are none."""
+    empty = True
+    for chunk in chunks:
+        empty = False
+        yield chunk
+    if empty:
+        yield from split_text(text, chunk_size=_CHUNK_SIZE, overlap=_CHUNK_OVERLAP)
+
+
+def load_single_document(
+    path: Union[str, os.PathLike],
+    *,
+    encoding: str = "utf-8",
+    parse_tags: bool = True,
+    tag_prefix: str = "tags:"
+) -> List[Document]:
+    """Load one text file and split it into document chunks.
+
+    The file is handled exactly as by :func:`load_documents_from_dir`,
+    which calls this function for every file it finds; see there for
+    the tags convention and the metadata attached to each chunk.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        Path to the text file.
+    encoding, parse_tags, tag_prefix
+        As for :func:`load_documents_from_dir`.
+
+    Returns
+    -------
+    list of :class:`Document`
+        The chunks of the file, empty if it holds no text.
+    """
+    path = os.fspath(path)
+    docs: List[Document] = []
+    source = os.path.basename(os.path.normpath(path))
+    # Use the file path as the document id
+    doc_id = os.path.realpath(path)
+    with open(path, 'r', encoding=encoding, errors='ignore') as f:
+        # The first line with any text decides whether there are tags
+        head = ""
+        while not head:
+            line = f.readline(_READ_BLOCK)
+            if not line:
+                break
+            head = line.lstrip()
+        while head and "\n" not in head and len(head) < len(tag_prefix):
+            rest = f.readline(_READ_BLOCK)
+            if not rest:
+                break
+            head += rest
+        tags: Optional[Tuple[str, ...]] = None
+        if parse_tags and head:
+            # Only the leading characters can match, so lower just those
+            # rather than the whole first line
+            prefix = tag_prefix.lower()
+            if head[:len(prefix)].lower() == prefix:
+                while not head.endswith("\n"):
+                    rest = f.readline(_READ_BLOCK)
+                    if not rest:
+                        break
+                    head += rest
+                first_line = head.splitlines()[0].strip()
+                # parse tags
+                tag_str = first_line[len(tag_prefix):].strip()
+                tags = tuple(t.strip() for t in tag_str.split(',') if t.strip())
+        # Drop the tags line from the text, unless nothing follows it
+        chunks = _stream_chunks(f, "" if tags is not None else head)
+        if tags is not None:
+            chunks = _with_fallback(chunks, head.strip())
+        # If the file is empty after removing the tag line, there are
+        # no chunks and the file is skipped
+        for idx, chunk in enumerate(chunks):
+            metadata: Dict[str, any] = {
+                'source': source,
+                'doc_id': doc_id,
+                'chunk_id': f"{doc_id}::chunk{idx}",
+                'content_hash': content_hash(chunk),
+            }
+            if tags:
+                metadata['tags'] = tags
+            docs.append(Document(content=chunk, metadata=metadata))
+    return docs
 
 
 def load_documents_from_dir(
@@ -100,7 +279,8 @@ def load_documents_from_dir(
     memory and split into chunks using :func:`split_text`.  The
     returned list contains one :class:`Document` per chunk; the
     metadata on each chunk includes the original filename (under
-    ``source``) and a unique ``doc_id`` derived from the file path.
+    ``source``), a unique ``doc_id`` derived from the file path and
+    the ``content_hash`` of the chunk text.
 
     The loader also supports a simple convention for assigning tags to
     documents: if the first non‑empty line in a file begins with
@@ -128,39 +308,20 @@ def load_documents_from_dir(
         A list of document chunks ready for indexing.
     """
     docs: List[Document] = []
-    base_path = pathlib.Path(data_dir)
-    if not base_path.exists():
+    if not os.path.exists(data_dir):
         raise FileNotFoundError(f"Data directory not found: {data_dir}")
-    for path in base_path.rglob("*.txt"):
-        with open(path, 'r', encoding=encoding, errors='ignore') as f:
-            raw_text = f.read().strip()
-        tags: Optional[List[str]] = None
-        text_start = 0
-        if parse_tags:
-            # Check first line for tag prefix
-            lines = raw_text.splitlines()
-            if lines:
-                first_line = lines[0].strip()
-                if first_line.lower().startswith(tag_prefix.lower()):
-                    # parse tags
-                    tag_str = first_line[len(tag_prefix):].strip()
-                    tags = [t.strip() for t in tag_str.split(',') if t.strip()]
-                    # drop the tags line from the text
-                    text_start = raw_text.index("\n") + 1 if "\n" in raw_text else 0
-        content_to_split = raw_text[text_start:].strip()
-        # If the file is empty after removing the tag line, skip it
-        if not content_to_split:
-            continue
-        chunks = split_text(content_to_split)
-        # Use the file path as the document id
-        doc_id = str(path.resolve())
-        for idx, chunk in enumerate(chunks):
-            metadata: Dict[str, any] = {
-                'source': str(path.name),
-                'doc_id': doc_id,
-                'chunk_id': f"{doc_id}::chunk{idx}"
-            }
-            if tags:
-                metadata['tags'] = tags
-            docs.append(Document(content=chunk, metadata=metadata))
-    return docs
\ No newline at end of file
+    paths = list(_iter_txt(os.fspath(data_dir)))
+    if not paths:
+        return docs
+    if len(paths) >= _PREFETCH_MIN_FILES:
+        _prefetch(paths)
+    # Reading is I/O bound, so threads overlap the waits; map keeps the
+    # files in walk order.
+    workers = min(_MAX_LOADER_THREADS, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        load = functools.partial(
+            load_single_document, encoding=encoding, parse_tags=parse_tags, tag_prefix=tag_prefix
+        )
+        for file_docs in pool.map(load, paths):
+            docs.extend(file_docs)
+    return docs
@@ -0,0 +1,27 @@
+"""Build script for the ``rag_system`` package.
+
+The Cython BM25 kernel in ``rag_system/_bm25.pyx`` is compiled when
+Cython and a C compiler are available.  Otherwise the package is
+installed without it and BM25 is scored with numpy.  For a source
+checkout, ``python setup.py build_ext --inplace`` builds it in place.
+"""
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("rag_system._bm25", ["rag_system/_bm25.pyx"], optional=True)],
+        language_level=3,
+    )
+
+setup(
+    name="rag_system",
+    version="0.1.0",
+    packages=["rag_system"],
+    install_requires=["numpy"],
+    ext_modules=ext_modules,
+)
@@ -0,0 +1,38 @@
+"""Shared fixtures for the rag_system tests."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """Keep every test on the TF‑IDF fallback, whatever .env contains."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("RAG_REUSE_NEAR_DUPLICATES", raising=False)
+
+
+def write_docs(directory: Path, docs: dict) -> None:
+    """Write ``{name: text}`` as ``.txt`` files under ``directory``."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, text in docs.items():
+        (directory / f"{name}.txt").write_text(text, encoding="utf-8")
+
+
+CORPUS = {
+    "alice": "tags: people\nAlice maintains the billing service and reviews its releases.",
+    "deploy": "Deployments run every Tuesday after the integration tests pass.",
+    "oncall": "The on call rota rotates weekly between the platform engineers.",
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    directory = tmp_path / "data"
+    write_docs(directory, CORPUS)
+    return directory
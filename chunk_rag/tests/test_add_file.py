@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import re
+
+import pytest
+
+import add_file
+
+
+def _reference_slugify(text, max_length=48):
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "entry"
+    if len(slug) > max_length:
+        slug = slug[:max_length].rstrip("-")
+    return slug
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Who maintains the Billing Service?",
+        "  --leading and trailing--  ",
+        "",
+        "???",
+        "Ünïcödé wörds and 漢字",
+        "İstanbul",  # lowers to "i" plus a combining dot
+        "200 Kelvin",  # Kelvin sign lowers to "k"
+        "x" * 47 + " tail",
+        "a" * 100,
+        "tabs\tand\nnewlines",
+    ],
+)
+def test_slugify_matches_lower_and_regex(text):
+    assert add_file._slugify(text) == _reference_slugify(text)
+
+
+def test_slugify_respects_max_length():
+    assert add_file._slugify("abc def ghi", max_length=4) == "abc"
+
+
+def test_write_record_retries_short_writes(tmp_path, monkeypatch):
+    write = os.write
+    sizes = []
+
+    def short_write(fd, data):
+        size = 1 + len(sizes) % 3
+        sizes.append(size)
+        return write(fd, bytes(data[:size]))
+
+    monkeypatch.setattr(add_file.os, "write", short_write)
+    path = tmp_path / "record.txt"
+    path.write_text("stale contents that are longer than the record " * 4, encoding="utf-8")
+    add_file._write_record(path, "Wer wartet den Dienst?", "Jürgen 🙂")
+    assert path.read_bytes() == "Question: Wer wartet den Dienst?\nAnswer: Jürgen 🙂\n".encode("utf-8")
+    assert len(sizes) > 1
+
+
+def test_add_many_writes_unique_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(add_file, "_timestamp", lambda: "20260101000000")
+    pairs = [("Same question?", "one"), ("Same question?", "two")]
+    paths = add_file.add_many(pairs, tmp_path / "new")
+    assert [path.name for path in paths] == [
+        "20260101000000_0000_same-question.txt",
+        "20260101000000_0001_same-question.txt",
+    ]
+    assert [path.read_text(encoding="utf-8") for path in paths] == [
+        "Question: Same question?\nAnswer: one\n",
+        "Question: Same question?\nAnswer: two\n",
+    ]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from conftest import write_docs
+from rag_system.main import RAGClient
+
+SETTINGS = dict(model="gpt-4o", top_k=5, tags=None, temperature=0.2, max_tokens=1024)
+QUESTION = "Who maintains the billing service?"
+
+
+def _cache_answer(client, answer):
+    cache = client.answer_cache
+    cache.set(cache.key(QUESTION, **SETTINGS), answer)
+
+
+def _cached(client, **overrides):
+    cache = client.answer_cache
+    return cache.get(cache.key(QUESTION, **{**SETTINGS, **overrides}))
+
+
+def test_answer_survives_restart_with_unchanged_corpus(data_dir):
+    _cache_answer(RAGClient.from_directory(str(data_dir)), "Alice")
+    assert _cached(RAGClient.from_directory(str(data_dir))) == "Alice"
+
+
+def test_answer_dropped_when_corpus_changes_between_runs(data_dir):
+    _cache_answer(RAGClient.from_directory(str(data_dir)), "Alice")
+    write_docs(data_dir, {"handover": "Bob now maintains the billing service."})
+    assert _cached(RAGClient.from_directory(str(data_dir))) is None
+
+
+def test_answer_dropped_when_file_edited_between_runs(data_dir):
+    _cache_answer(RAGClient.from_directory(str(data_dir)), "Alice")
+    write_docs(data_dir, {"alice": "Bob maintains the billing service."})
+    assert _cached(RAGClient.from_directory(str(data_dir))) is None
+
+
+def test_add_files_invalidates_running_client(data_dir, tmp_path):
+    client = RAGClient.from_directory(str(data_dir))
+    _cache_answer(client, "Alice")
+    extra = tmp_path / "extra"
+    write_docs(extra, {"handover": "Bob now maintains the billing service."})
+    client.add_files([str(extra / "handover.txt")])
+    assert _cached(client) is None
+
+
+def test_answers_after_add_files_are_not_served_for_the_original_corpus(data_dir, tmp_path):
+    client = RAGClient.from_directory(str(data_dir))
+    extra = tmp_path / "extra"
+    write_docs(extra, {"handover": "Bob now maintains the billing service."})
+    client.add_files([str(extra / "handover.txt")])
+    _cache_answer(client, "Bob")
+    assert _cached(client) == "Bob"
+    assert _cached(RAGClient.from_directory(str(data_dir))) is None
+
+
+def test_generation_settings_are_part_of_the_key(data_dir):
+    client = RAGClient.from_directory(str(data_dir))
+    _cache_answer(client, "Alice")
+    assert _cached(client) == "Alice"
+    assert _cached(client, temperature=0.9) is None
+    assert _cached(client, max_tokens=16) is None
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from rag_system import main
+from rag_system.main import RAGClient
+
+SETTINGS = dict(model="gpt-4o", top_k=5, tags=None, temperature=0.2, max_tokens=1024)
+QUESTION = "Who maintains the billing service?"
+
+
+def _spy_embeddings(client, monkeypatch):
+    embedded = []
+    embed_queries = client.index.embed_queries
+
+    def spy(queries):
+        embedded.extend(queries)
+        return embed_queries(queries)
+
+    monkeypatch.setattr(client.index, "embed_queries", spy)
+    return embedded
+
+
+def test_blank_questions_are_not_embedded(data_dir, monkeypatch):
+    client = RAGClient.from_directory(str(data_dir))
+    cache = client.answer_cache
+    cache.set(cache.key(QUESTION, **SETTINGS), "Alice")
+    embedded = _spy_embeddings(client, monkeypatch)
+    answers = client.answer_questions_batch(["", "   ", QUESTION], **SETTINGS)
+    assert answers == [main._NO_CONTEXT_ANSWER, main._NO_CONTEXT_ANSWER, "Alice"]
+    assert embedded == []
+
+
+def test_only_blank_questions_need_no_api(data_dir, monkeypatch):
+    client = RAGClient.from_directory(str(data_dir))
+    embedded = _spy_embeddings(client, monkeypatch)
+    assert client.answer_questions_batch(["", "\n"]) == [main._NO_CONTEXT_ANSWER] * 2
+    assert embedded == []
+
+
+class _Completions:
+    async def create(self, *, messages, **kwargs):
+        question = messages[-1]["content"].rsplit("Question: ", 1)[1]
+        if "deploy" in question:
+            raise RuntimeError("500 Internal Server Error")
+        message = type("Message", (), {"content": f"answer to {question}"})
+        choice = type("Choice", (), {"message": message, "finish_reason": "stop"})
+        return type("Response", (), {"choices": [choice]})
+
+
+class _FakeAsyncOpenAI:
+    def __init__(self, **kwargs):
+        self.chat = type("Chat", (), {"completions": _Completions()})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def test_failed_completion_keeps_other_answers(data_dir, monkeypatch):
+    monkeypatch.setattr(main, "_openai_credentials", lambda: ("key", "http://localhost/"))
+    monkeypatch.setattr(main, "AsyncOpenAI", _FakeAsyncOpenAI)
+    client = RAGClient.from_directory(str(data_dir))
+    questions = ["When do deploy runs happen?", QUESTION]
+    answers = client.answer_questions_batch(questions, **SETTINGS)
+    assert isinstance(answers[0], RuntimeError)
+    assert answers[1].startswith("answer to " + QUESTION)
+    cache = client.answer_cache
+    assert cache.get(cache.key(questions[0], **SETTINGS)) is None
+    assert cache.get(cache.key(QUESTION, **SETTINGS)) == answers[1]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from rag_system import hybrid_retrieval
+from rag_system.hybrid_retrieval import LexicalRetriever
+from rag_system.utils import Document
+
+WORDS = [f"w{i}" for i in range(40)]
+
+
+def _documents(n, seed):
+    rng = random.Random(seed)
+    return [
+        Document(content=" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 30))), metadata={})
+        for _ in range(n)
+    ]
+
+
+def _reference_scores(corpus, query, k1=1.5, b=0.75):
+    num_docs = len(corpus)
+    avgdl = sum(map(len, corpus)) / num_docs
+    scores = np.zeros(num_docs)
+    for term in query:
+        df = sum(term in tokens for tokens in corpus)
+        if not df:
+            continue
+        idf = math.log((num_docs - df + 0.5) / (df + 0.5) + 1)
+        for i, tokens in enumerate(corpus):
+            f = tokens.count(term)
+            scores[i] += idf * f * (k1 + 1) / (f + k1 * (1 - b + b * len(tokens) / avgdl))
+    return scores
+
+
+@pytest.fixture
+def retriever(monkeypatch):
+    monkeypatch.setattr(hybrid_retrieval, "_BM25_AVAILABLE", False)
+    lexical = LexicalRetriever(_documents(50, 0))
+    # several batches leave several postings segments to accumulate
+    for seed in range(1, 6):
+        lexical.add_documents(_documents(7 * seed, seed))
+    assert len(lexical._segments) > 1
+    return lexical
+
+
+def test_segmented_scores_match_reference(retriever, monkeypatch):
+    monkeypatch.setattr(hybrid_retrieval, "_load_bm25_kernel", lambda: None)
+    query = ("w1", "w7", "w7", "w39", "unknown")
+    np.testing.assert_allclose(
+        retriever._bm25_scores(query), _reference_scores(retriever.corpus_tokens, query), rtol=1e-4
+    )
+
+
+def test_compiled_kernel_matches_numpy(retriever, monkeypatch):
+    if hybrid_retrieval._load_bm25_kernel() is None:
+        pytest.skip("no compiled BM25 kernel available")
+    query = ("w2", "w3", "w3", "w20")
+    compiled = retriever._bm25_scores(query)
+    monkeypatch.setattr(hybrid_retrieval, "_load_bm25_kernel", lambda: None)
+    np.testing.assert_allclose(compiled, retriever._bm25_scores(query), rtol=1e-4)
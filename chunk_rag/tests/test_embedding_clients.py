@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from rag_system.embedding import EmbeddingModel
+
+CREATED = {"sync": 0, "async": 0}
+
+
+def _response(inputs):
+    data = [
+        types.SimpleNamespace(index=i, embedding=[float(len(text)), 1.0])
+        for i, text in enumerate(inputs)
+    ]
+    return types.SimpleNamespace(data=data)
+
+
+class _Embeddings:
+    def create(self, *, model, input):
+        return _response(input)
+
+
+class _AsyncEmbeddings:
+    async def create(self, *, model, input):
+        return _response(input)
+
+
+class _OpenAI:
+    def __init__(self, **kwargs):
+        CREATED["sync"] += 1
+        self.embeddings = _Embeddings()
+
+
+class _AsyncOpenAI:
+    def __init__(self, **kwargs):
+        CREATED["async"] += 1
+        self.embeddings = _AsyncEmbeddings()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    fake = types.ModuleType("openai")
+    fake.OpenAI = _OpenAI
+    fake.AsyncOpenAI = _AsyncOpenAI
+    fake.RateLimitError = type("RateLimitError", (Exception,), {})
+    monkeypatch.setitem(sys.modules, "openai", fake)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    CREATED.update({"sync": 0, "async": 0})
+    model = EmbeddingModel()
+    yield model
+    model.close()
+
+
+def test_queries_use_the_cached_sync_client(embedder):
+    for query in ("first", "second", "third"):
+        embedder.embed_texts([query])
+    assert CREATED == {"sync": 1, "async": 0}
+
+
+def test_corpus_batches_share_one_async_client_and_limiter(embedder):
+    texts = [f"text {i}" for i in range(5)]
+    first = embedder.embed_batch(texts, batch_size=2)
+    limiter = embedder._limiter
+    second = embedder.embed_batch(texts, batch_size=2)
+    assert CREATED["async"] == 1
+    assert embedder._limiter is limiter
+    np.testing.assert_array_equal(first, second)
+    assert first[:, 0].tolist() == [float(len(text)) for text in texts]
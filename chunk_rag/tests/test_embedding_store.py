@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rag_system import cache
+from rag_system.cache import EmbeddingStore, minhash_signature
+from rag_system.embedding import EmbeddingModel
+from rag_system.hybrid_retrieval import HybridRetriever
+from rag_system.utils import Document, content_hash
+
+
+def _docs(texts, name):
+    return [
+        Document(
+            content=text,
+            metadata={
+                "source": f"{name}.txt",
+                "doc_id": name,
+                "chunk_id": f"{name}::chunk{i}",
+                "content_hash": content_hash(text),
+            },
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_tfidf_vectors_are_not_reused_across_corpora(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = _docs(["alpha beta", "beta gamma"], "first")
+    second = _docs(["alpha beta", "delta epsilon zeta", "eta theta iota kappa"], "second")
+    HybridRetriever(first, EmbeddingModel(), cache_dir=cache_dir)
+    retriever = HybridRetriever(second, EmbeddingModel(), cache_dir=cache_dir)
+    fresh = HybridRetriever(second, EmbeddingModel())
+    np.testing.assert_allclose(retriever.embeddings, fresh.embeddings, rtol=1e-6)
+
+
+def test_vectors_are_reused_for_the_same_corpus(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    docs = _docs(["alpha beta", "beta gamma", "gamma delta"], "doc")
+    built = HybridRetriever(docs, EmbeddingModel(), cache_dir=cache_dir)
+    embedder = EmbeddingModel()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached vectors should have been reused")
+
+    monkeypatch.setattr(embedder, "embed_batch", fail)
+    reloaded = HybridRetriever(docs, embedder, cache_dir=cache_dir)
+    np.testing.assert_allclose(reloaded.embeddings, built.embeddings, rtol=1e-6)
+
+
+def test_store_round_trips_every_dtype(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    for dtype, tolerance in (("float32", 0), ("float16", 1e-2), ("int8", 5e-2)):
+        store = EmbeddingStore(str(tmp_path / f"{dtype}.sqlite"), dtype=dtype)
+        store.put_many("m", ["a", "b", "c"], vectors)
+        found = store.get_many("m", ["a", "b", "c", "missing"])
+        assert sorted(found) == ["a", "b", "c"]
+        for key, row in zip("abc", vectors):
+            np.testing.assert_allclose(found[key], row, atol=tolerance)
+        store.close()
+
+
+@pytest.mark.skipif(not cache._DATASKETCH_AVAILABLE, reason="datasketch is not installed")
+def test_near_duplicate_index_is_built_once(tmp_path, monkeypatch):
+    base = "the quick brown fox jumps over the lazy dog near the river bank " * 4
+    store = EmbeddingStore(str(tmp_path / "store.sqlite"))
+    store.put_signatures("m", {"a": minhash_signature(base)})
+    builds = []
+    build = store._build_lsh
+    monkeypatch.setattr(store, "_build_lsh", lambda model: builds.append(model) or build(model))
+
+    query = {"q": minhash_signature(base + "!")}
+    assert store.near_duplicates("m", query) == {"q": "a"}
+    store.put_signatures("m", {"b": minhash_signature("an unrelated sentence " * 8)})
+    assert store.near_duplicates("m", {"r": minhash_signature("an unrelated sentence " * 8 + ".")}) == {"r": "b"}
+    assert builds == ["m"]
+    store.close()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from rag_system import env
+from rag_system.env import env_choice, env_flag, load_env
+
+ENV_FILE = """\
+# comment line
+  # indented comment
+PLAIN=value
+SPACED  =   padded value\t
+DOUBLE="quoted # not a comment"
+SINGLE='it''s'
+EMPTY_QUOTES=""
+EMPTY=
+export EXPORTED=yes
+\texport  TABBED='tab'
+UNMATCHED="open
+MIXED="a'
+INLINE=value # kept verbatim
+not a pair
+1BAD=ignored
+"""
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    path = tmp_path / ".env"
+    path.write_text(ENV_FILE, encoding="utf-8")
+    for key in env._parse_env(str(path)):
+        monkeypatch.delenv(key, raising=False)
+    return path
+
+
+def test_parse_env(env_file):
+    assert env._parse_env(str(env_file)) == {
+        "PLAIN": "value",
+        "SPACED": "padded value",
+        "DOUBLE": "quoted # not a comment",
+        "SINGLE": "'it''s'",
+        "EMPTY_QUOTES": "",
+        "EMPTY": "",
+        "EXPORTED": "yes",
+        "TABBED": "tab",
+        "UNMATCHED": '"open',
+        "MIXED": "\"a'",
+        "INLINE": "value # kept verbatim",
+    }
+
+
+def test_crlf_line_endings(tmp_path):
+    path = tmp_path / ".env"
+    path.write_bytes(b"A=1\r\nB='two'\r\n")
+    assert env._parse_env(str(path)) == {"A": "1", "B": "two"}
+
+
+def test_missing_file_sets_nothing(tmp_path):
+    assert env._parse_env(str(tmp_path / "missing.env")) == {}
+
+
+def test_existing_variables_take_precedence(env_file, monkeypatch):
+    monkeypatch.setenv("PLAIN", "from the shell")
+    load_env(env_file)
+    assert os.environ["PLAIN"] == "from the shell"
+    assert os.environ["EXPORTED"] == "yes"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, False), ("1", True), (" Yes ", True), ("ON", True), ("0", False), ("enabled", False)],
+)
+def test_env_flag(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("RAG_TEST_FLAG", raising=False)
+    else:
+        monkeypatch.setenv("RAG_TEST_FLAG", value)
+    assert env_flag("RAG_TEST_FLAG") is expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, "float32"), ("int8", "int8"), (" Float16 ", "float16"), ("float8", "float32"), ("", "float32")],
+)
+def test_env_choice(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("RAG_TEST_CHOICE", raising=False)
+    else:
+        monkeypatch.setenv("RAG_TEST_CHOICE", value)
+    assert env_choice("RAG_TEST_CHOICE", {"float32", "float16", "int8"}, "float32") == expected
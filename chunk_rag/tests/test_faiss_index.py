@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rag_system import hybrid_retrieval
+
+faiss = pytest.importorskip("faiss")
+
+
+def test_ivfpq_trains_on_enough_points_per_list(monkeypatch):
+    monkeypatch.setattr(hybrid_retrieval, "_TRAIN_SAMPLE", 100)
+    trained = []
+    train = faiss.IndexIVFPQ.train
+
+    def spy(index, vectors):
+        trained.append(len(vectors))
+        return train(index, vectors)
+
+    monkeypatch.setattr(faiss.IndexIVFPQ, "train", spy)
+    vectors = np.random.default_rng(0).standard_normal((10_000, 32)).astype(np.float32)
+    index = hybrid_retrieval.build_faiss_index(vectors, compress=True)
+    nlist = int(np.sqrt(len(vectors)))
+    assert trained == [hybrid_retrieval._MIN_POINTS_PER_CENTROID * nlist]
+    assert index.ntotal == len(vectors)
+
+
+def _spy_threads(monkeypatch):
+    calls = []
+    monkeypatch.setattr(faiss, "omp_set_num_threads", calls.append)
+    return calls
+
+
+def test_thread_pool_left_alone_by_default(monkeypatch):
+    monkeypatch.delenv("RAG_FAISS_THREADS", raising=False)
+    calls = _spy_threads(monkeypatch)
+    hybrid_retrieval.VectorRetriever(np.eye(4, dtype=np.float32))
+    assert calls == []
+
+
+def test_thread_pool_set_when_asked(monkeypatch):
+    calls = _spy_threads(monkeypatch)
+    hybrid_retrieval.VectorRetriever(np.eye(4, dtype=np.float32), threads=3)
+    monkeypatch.setenv("RAG_FAISS_THREADS", "2")
+    hybrid_retrieval.VectorRetriever(np.eye(4, dtype=np.float32))
+    monkeypatch.setenv("RAG_FAISS_THREADS", "many")
+    hybrid_retrieval.VectorRetriever(np.eye(4, dtype=np.float32))
+    assert calls == [3, 2]
+
+
+def test_gpu_only_on_explicit_opt_in(monkeypatch):
+    monkeypatch.delenv("RAG_USE_GPU", raising=False)
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "0")
+    assert not hybrid_retrieval._gpu_requested()
+    monkeypatch.setenv("RAG_USE_GPU", "1")
+    assert hybrid_retrieval._gpu_requested()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from conftest import write_docs
+from rag_system import utils
+from rag_system.utils import (
+    _iter_txt,
+    load_documents_from_dir,
+    load_single_document,
+    split_text,
+)
+
+
+def _reference_split(text, chunk_size=800, overlap=50):
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        chunks.append(text[start:end])
+        if end == len(text):
+            break
+        start = end - overlap
+    return chunks
+
+
+def _reference_load(path, tag_prefix="tags:"):
+    """Chunks and tags of ``path`` as read with a single ``read()``."""
+    with open(path, encoding="utf-8") as f:
+        raw = f.read().strip()
+    tags, start = None, 0
+    lines = raw.splitlines()
+    if lines and lines[0].strip().lower().startswith(tag_prefix):
+        tag_str = lines[0].strip()[len(tag_prefix):].strip()
+        tags = tuple(t.strip() for t in tag_str.split(",") if t.strip())
+        start = raw.index("\n") + 1 if "\n" in raw else 0
+    return _reference_split(raw[start:].strip()), tags
+
+
+def _mixed_text(length, seed=0):
+    # One to four bytes per character in UTF-8, so block and decoder
+    # buffer edges fall inside multi-byte sequences
+    alphabet = "abc de\n" + "é ß" + "漢字 " + "🙂🚀"
+    rng = random.Random(seed)
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+FILES = {
+    "empty": "",
+    "blank": " \n\n  \t\n",
+    "short": "  hello world  \n",
+    "exact": "x" * 800,
+    "long": "\n\n  " + _mixed_text(5000) + "  \n\n",
+    "tagged": "\n tags: alpha, beta ,\n" + _mixed_text(2500, seed=1),
+    "tags_only": "TAGS: alpha",
+    "tags_and_blank": "tags: alpha\n\n   \n",
+    "late_tags": "intro\ntags: alpha\n" + _mixed_text(900, seed=2),
+}
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(800, 50), (10, 3), (5, 4), (7, 0)])
+@pytest.mark.parametrize("length", [0, 1, 5, 10, 11, 800, 1601, 2500])
+def test_split_text_matches_reference(chunk_size, overlap, length):
+    text = _mixed_text(length)
+    assert split_text(text, chunk_size=chunk_size, overlap=overlap) == _reference_split(
+        text, chunk_size, overlap
+    )
+
+
+def test_split_text_rejects_overlap_not_below_chunk_size():
+    with pytest.raises(ValueError):
+        split_text("abc", chunk_size=4, overlap=4)
+
+
+@pytest.mark.parametrize("block", [1, 7, 100, 799, 801, 1 << 20])
+@pytest.mark.parametrize("name", sorted(FILES))
+def test_streamed_chunks_match_whole_file(tmp_path, monkeypatch, block, name):
+    monkeypatch.setattr(utils, "_READ_BLOCK", block)
+    write_docs(tmp_path, {name: FILES[name]})
+    path = tmp_path / f"{name}.txt"
+    chunks, tags = _reference_load(path)
+    docs = load_single_document(path)
+    assert [doc.content for doc in docs] == chunks
+    for i, doc in enumerate(docs):
+        assert doc.metadata.get("tags") == (tags or None)
+        assert doc.metadata["chunk_id"].endswith(f"::chunk{i}")
+        assert doc.metadata["content_hash"] == utils.content_hash(doc.content)
+
+
+def test_tags_are_not_parsed_when_disabled(tmp_path):
+    write_docs(tmp_path, {"tagged": "tags: alpha\nbody"})
+    docs = load_single_document(tmp_path / "tagged.txt", parse_tags=False)
+    assert [doc.content for doc in docs] == ["tags: alpha\nbody"]
+    assert "tags" not in docs[0].metadata
+
+
+def _tree(root: Path) -> None:
+    write_docs(root, {"a": "a", "b": "b"})
+    (root / "notes.md").write_text("skipped", encoding="utf-8")
+    write_docs(root / "sub", {"c": "c"})
+    write_docs(root / "sub" / "deep", {"d": "d"})
+    write_docs(root / "z", {"e": "e"})
+
+
+def test_iter_txt_matches_rglob_order(tmp_path):
+    _tree(tmp_path)
+    expected = [str(path) for path in tmp_path.rglob("*.txt")]
+    assert list(_iter_txt(str(tmp_path))) == expected
+    assert len(expected) == 5
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symbolic links are not supported")
+def test_iter_txt_does_not_follow_directory_links(tmp_path):
+    _tree(tmp_path / "data")
+    try:
+        os.symlink(tmp_path / "data" / "sub", tmp_path / "data" / "link", target_is_directory=True)
+        os.symlink(tmp_path / "data" / "a.txt", tmp_path / "data" / "alias.txt")
+    except OSError:
+        pytest.skip("cannot create symbolic links here")
+    names = sorted(os.path.relpath(path, tmp_path / "data") for path in _iter_txt(str(tmp_path / "data")))
+    assert names == sorted(
+        ["a.txt", "alias.txt", "b.txt", os.path.join("sub", "c.txt"),
+         os.path.join("sub", "deep", "d.txt"), os.path.join("z", "e.txt")]
+    )
+
+
+def test_load_documents_from_dir_keeps_walk_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "_PREFETCH_MIN_FILES", 1)
+    _tree(tmp_path)
+    write_docs(tmp_path / "sub", {"big": _mixed_text(3000, seed=3)})
+    docs = load_documents_from_dir(str(tmp_path))
+    expected = [
+        (str(path.resolve()), chunk)
+        for path in tmp_path.rglob("*.txt")
+        for chunk in _reference_load(path)[0]
+    ]
+    assert [(doc.metadata["doc_id"], doc.content) for doc in docs] == expected
+
+
+def test_load_documents_from_dir_requires_directory(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_documents_from_dir(str(tmp_path / "missing"))
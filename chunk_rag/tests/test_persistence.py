@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from conftest import CORPUS, write_docs
+from rag_system.embedding import EmbeddingModel
+from rag_system.hybrid_retrieval import HybridRetriever
+from rag_system.utils import load_documents_from_dir
+
+EXTRA = {
+    "handover": "tags: people, billing\nBob now maintains the billing service.",
+    "release": "Release notes are published after each Tuesday deployment.",
+}
+
+
+def _state(retriever):
+    return [(doc.content, doc.metadata) for doc in retriever.documents]
+
+
+def _results(retriever, query):
+    return [(doc.content, round(score, 5)) for doc, score in retriever.retrieve(query, top_k=3)]
+
+
+def test_save_append_load_round_trip(tmp_path):
+    write_docs(tmp_path / "base", CORPUS)
+    write_docs(tmp_path / "extra", EXTRA)
+    base = load_documents_from_dir(str(tmp_path / "base"))
+    extra = load_documents_from_dir(str(tmp_path / "extra"))
+    embedder = EmbeddingModel()
+    embedder.fit([doc.content for doc in base])
+    retriever = HybridRetriever(base, embedder)
+    saved = str(tmp_path / "index")
+    retriever.save(saved)
+    retriever.append_to_disk(saved, extra)
+    assert any(name.startswith("documents-") for name in os.listdir(saved))
+
+    loaded = HybridRetriever.load(saved)
+    assert _state(loaded) == _state(retriever)
+    tags = {doc.metadata["source"]: doc.metadata.get("tags") for doc in loaded.documents}
+    assert tags["handover.txt"] == ("people", "billing")
+    np.testing.assert_allclose(loaded.embeddings, retriever.embeddings, rtol=1e-6)
+    for query in ("Who maintains billing?", "When are deployments?"):
+        assert _results(loaded, query) == _results(retriever, query)
+    assert loaded.retrieve("billing", tags=["billing"])
+
+    # a full save folds the segment back into the base files
+    loaded.save(saved)
+    assert not any(name.startswith("documents-") for name in os.listdir(saved))
+    assert _state(HybridRetriever.load(saved)) == _state(retriever)
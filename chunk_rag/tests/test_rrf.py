@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rag_system.rrf import reciprocal_rank_fusion, reciprocal_rank_fusion_array
+
+
+def _random_runs(seed, n_runs=3, pool=200, length=50):
+    rng = np.random.default_rng(seed)
+    return [rng.choice(pool, size=length, replace=False).tolist() for _ in range(n_runs)]
+
+
+RUNS = {
+    "empty": [],
+    "empty_runs": [[], []],
+    "single": [[4, 2, 9]],
+    # Mirrored runs tie every pair of documents at the same depth
+    "ties": [[1, 2, 3, 4], [2, 1, 4, 3]],
+    "disjoint": [[1, 2, 3], [4, 5, 6]],
+    "uneven": [[7], [3, 7, 5, 1, 0], [5, 3]],
+    "random": _random_runs(0),
+    "random_overlap": _random_runs(1, n_runs=4, pool=60, length=40),
+}
+
+
+@pytest.mark.parametrize("weights", [None, "uneven"])
+@pytest.mark.parametrize("top_k", [None, 0, 1, 2, 3, 10, 1000])
+@pytest.mark.parametrize("name", sorted(RUNS))
+def test_array_fusion_matches_reference(name, top_k, weights):
+    runs = RUNS[name]
+    if weights == "uneven":
+        weights = [1.0 + 0.5 * i for i in range(len(runs))]
+    expected = reciprocal_rank_fusion(runs, weights=weights, top_k=top_k)
+    ids, scores = reciprocal_rank_fusion_array(runs, weights=weights, top_k=top_k)
+    assert ids.tolist() == [doc_id for doc_id, _ in expected]
+    np.testing.assert_allclose(scores, [score for _, score in expected], rtol=1e-12)
+
+
+def test_ties_keep_first_appearance_order():
+    ids, scores = reciprocal_rank_fusion_array(RUNS["ties"], top_k=3)
+    assert ids.tolist() == [1, 2, 3]
+    assert scores[0] == scores[1]
+
+
+def test_weights_must_match_runs():
+    with pytest.raises(ValueError):
+        reciprocal_rank_fusion([[1], [2]], weights=[1.0])
+    with pytest.raises(ValueError):
+        reciprocal_rank_fusion_array([[1], [2]], weights=[1.0])
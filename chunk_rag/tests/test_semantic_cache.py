@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+
+from conftest import write_docs
+from rag_system.cache import SemanticCache
+from rag_system.main import RAGClient
+
+
+def _vectors(n, dim=16):
+    return np.random.default_rng(1).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "semantic.sqlite")
+    vectors = _vectors(50)
+    cache = SemanticCache(path, signature="m", corpus="c")
+    for i, vector in enumerate(vectors):
+        cache.add(vector, "scope", f"answer {i}")
+    cache.close()
+    reopened = SemanticCache(path, signature="m", corpus="c")
+    assert len(reopened) == 50
+    for i in (0, 17, 49):
+        assert reopened.lookup(vectors[i], "scope") == f"answer {i}"
+    assert reopened.lookup(vectors[0], "other scope") is None
+
+
+def test_entries_dropped_for_another_corpus_or_model(tmp_path):
+    path = str(tmp_path / "semantic.sqlite")
+    vector = _vectors(1)[0]
+    cache = SemanticCache(path, signature="m", corpus="c")
+    cache.add(vector, "scope", "Alice")
+    cache.close()
+    assert SemanticCache(path, signature="m", corpus="c2").lookup(vector, "scope") is None
+    assert SemanticCache(path, signature="m2", corpus="c2").lookup(vector, "scope") is None
+
+
+def test_set_corpus_is_persisted(tmp_path):
+    path = str(tmp_path / "semantic.sqlite")
+    vector = _vectors(1)[0]
+    cache = SemanticCache(path, signature="m", corpus="c")
+    cache.add(vector, "scope", "Alice")
+    cache.set_corpus("c2")
+    assert cache.lookup(vector, "scope") is None
+    cache.add(vector, "scope", "Bob")
+    cache.close()
+    assert SemanticCache(path, signature="m", corpus="c2").lookup(vector, "scope") == "Bob"
+    assert len(SemanticCache(path, signature="m", corpus="c")) == 0
+
+
+def test_client_drops_paraphrase_answers_when_corpus_changes(data_dir):
+    question = "Who maintains the billing service?"
+    client = RAGClient.from_directory(str(data_dir))
+    client.semantic_cache.add(client.index.embed_query(question), "scope", "Alice")
+    client.semantic_cache.close()
+    client = RAGClient.from_directory(str(data_dir))
+    assert client.semantic_cache.lookup(client.index.embed_query(question), "scope") == "Alice"
+    client.semantic_cache.close()
+    write_docs(data_dir, {"handover": "Bob now maintains the billing service."})
+    client = RAGClient.from_directory(str(data_dir))
+    assert client.semantic_cache.lookup(client.index.embed_query(question), "scope") is None
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rag_system import hybrid_retrieval
+from rag_system.hybrid_retrieval import VectorRetriever
+
+DTYPES = ["float32", "float16", "int8"]
+
+
+@pytest.fixture
+def brute_force(monkeypatch):
+    """Build retrievers on the numpy fallback with the given storage dtype."""
+    monkeypatch.setattr(hybrid_retrieval, "_FAISS_AVAILABLE", False)
+
+    def build(dtype, embeddings, **kwargs):
+        monkeypatch.setenv("RAG_VECTOR_DTYPE", dtype)
+        return VectorRetriever(embeddings, **kwargs)
+
+    return build
+
+
+def _data(n=500, dim=48, queries=40, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors, rng.standard_normal((queries, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("top_k", [1, 10, 1000])
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_query_batch_matches_query(brute_force, dtype, top_k):
+    vectors, queries = _data()
+    retriever = brute_force(dtype, vectors[:300])
+    retriever.add_embeddings(vectors[300:])
+    assert retriever.normalised.dtype == np.dtype(dtype)
+    queries[3] = 0
+    batch = retriever.query_batch(queries, top_k=top_k)
+    assert batch == [retriever.query(q, top_k=top_k) for q in queries]
+    assert batch[3] == []
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_reduced_precision_recall(brute_force, dtype):
+    vectors, queries = _data(n=2000, dim=64, queries=100, seed=1)
+    exact = brute_force("float32", vectors).query_batch(queries, top_k=10)
+    approx = brute_force(dtype, vectors).query_batch(queries, top_k=10)
+    recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx, exact)])
+    assert recall >= (0.99 if dtype == "float16" else 0.9)
+
+
+def test_unknown_dtype_falls_back_to_float32(brute_force):
+    vectors, _ = _data(n=20)
+    assert brute_force("float8", vectors).normalised.dtype == np.float32